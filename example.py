@@ -4,59 +4,99 @@ ML Plotter 使用示例
 """
 
 import os
+import matplotlib
+
+# 设置 ML_PLOTTER_HEADLESS=1 时使用非交互的Agg后端，只保存图片不弹出窗口
+HEADLESS = os.environ.get("ML_PLOTTER_HEADLESS") == "1"
+if HEADLESS:
+    matplotlib.use("Agg")
+
 import numpy as np
 import pandas as pd
 from ml_plotter import MLPlotter, quick_plot, plot_comparison
 import matplotlib.pyplot as plt
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # PyArrow可选，缺失时退回pandas写CSV
+    pa = None
+
+# 每个方法的性能特征: (基础性能, 增长系数, 噪声尺度)
+METHOD_PROFILES = {
+    "Vanilla": (1000, 500, 100),
+    "ReDo": (1200, 600, 80),
+    "ReGraMa": (1400, 700, 60),
+}
+
+# 固定的随机种子偏移，保证示例数据在不同解释器间可复现
+METHOD_SEED_OFFSETS = {
+    "Vanilla": 0,
+    "ReDo": 100,
+    "ReGraMa": 200,
+}
+
+N_SEEDS = 3
+
+def _write_csv(path, columns):
+    """将列字典写入CSV，优先使用PyArrow"""
+    if pa is not None:
+        pa_csv.write_csv(pa.Table.from_pydict(columns), path)
+    else:
+        pd.DataFrame(columns).to_csv(path, index=False)
+
+def show_figure(fig):
+    """显示图表（无界面模式下跳过），随后关闭以释放内存"""
+    if not HEADLESS:
+        plt.show()
+    plt.close(fig)
+
 def create_sample_data():
     """创建示例数据用于演示"""
-    print("创建示例数据...")
-    
     # 创建示例数据文件夹
-    methods = ["Vanilla", "ReDo", "ReGraMa"]
     base_dir = "sample_data"
     
+    # 数据已完整存在时直接复用，避免每个示例重复生成
+    if os.path.isdir(base_dir) and all(
+        os.path.exists(os.path.join(base_dir, method, f"seed_{seed}.csv"))
+        for method in METHOD_PROFILES for seed in range(N_SEEDS)
+    ):
+        return base_dir
+    
+    print("创建示例数据...")
+    
     if not os.path.exists(base_dir):
         os.makedirs(base_dir)
     
-    for method in methods:
+    # 所有方法和种子共享同一步数轴和对数增长曲线
+    steps = np.arange(0, 1000000, 1000)
+    log_steps = np.log1p(steps) / np.log(1000000)
+    
+    for method, (base, coef, noise_scale) in METHOD_PROFILES.items():
         method_dir = os.path.join(base_dir, method)
         if not os.path.exists(method_dir):
             os.makedirs(method_dir)
         
-        # 为每个方法创建3个种子的数据
-        for seed in range(3):
-            # 生成模拟的训练数据
-            steps = np.arange(0, 1000000, 1000)
-            
-            # 不同方法有不同的性能特征
-            if method == "Vanilla":
-                base_performance = 1000 + 500 * np.log(steps + 1) / np.log(1000000)
-                noise_scale = 100
-            elif method == "ReDo":
-                base_performance = 1200 + 600 * np.log(steps + 1) / np.log(1000000)
-                noise_scale = 80
-            else:  # ReGraMa
-                base_performance = 1400 + 700 * np.log(steps + 1) / np.log(1000000)
-                noise_scale = 60
-            
-            # 添加噪声
-            np.random.seed(seed + hash(method) % 1000)
-            noise = np.random.normal(0, noise_scale, len(steps))
-            episode_return = base_performance + noise
-            
-            # 确保性能不为负
-            episode_return = np.maximum(episode_return, 0)
-            
-            # 保存为CSV
-            df = pd.DataFrame({
+        # 不同方法有不同的性能特征
+        base_performance = base + coef * log_steps
+        
+        # 每个种子使用独立且确定的随机数流，增减种子数不影响已有种子的数据
+        offset = METHOD_SEED_OFFSETS[method]
+        noise = np.stack([
+            np.random.default_rng(seed + offset).standard_normal(len(steps))
+            for seed in range(N_SEEDS)
+        ]) * noise_scale
+        
+        # 确保性能不为负
+        episode_returns = np.maximum(base_performance + noise, 0)
+        
+        # 为每个方法保存3个种子的数据
+        for seed in range(N_SEEDS):
+            csv_path = os.path.join(method_dir, f"seed_{seed}.csv")
+            _write_csv(csv_path, {
                 'Step': steps,
-                f'{method.lower()} - episode_return': episode_return
+                f'{method.lower()} - episode_return': episode_returns[seed]
             })
-            
-            csv_path = os.path.join(method_dir, f"seed_{seed}.csv")
-            df.to_csv(csv_path, index=False)
     
     print(f"示例数据已创建在 {base_dir} 文件夹中")
     return base_dir
@@ -71,7 +111,7 @@ def example_1_quick_plot():
     # 一行代码生成专业图表
     fig = quick_plot(data_dir, title="Quick Plot Example", show_std=True)
     plt.savefig("example_1_quick_plot.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    show_figure(fig)
     
     print("图表已保存为 example_1_quick_plot.png")
 
@@ -103,7 +143,7 @@ def example_2_custom_training_curves():
     )
     
     plt.savefig("example_2_training_curves.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    show_figure(fig)
     
     print("图表已保存为 example_2_training_curves.png")
 
@@ -132,7 +172,7 @@ def example_3_performance_bars():
     )
     
     plt.savefig("example_3_performance_bars.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    show_figure(fig)
     
     print("图表已保存为 example_3_performance_bars.png")
 
@@ -158,7 +198,7 @@ def example_4_box_comparison():
     )
     
     plt.savefig("example_4_box_comparison.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    show_figure(fig)
     
     print("图表已保存为 example_4_box_comparison.png")
 
@@ -180,19 +220,19 @@ def example_5_convenience_functions():
     fig1 = plot_comparison(data_paths, plot_type="curves", 
                           title="Training Curves", show_std=False)
     plt.savefig("example_5_curves.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    show_figure(fig1)
     
     # 柱状图
     fig2 = plot_comparison(data_paths, plot_type="bars",
                           title="Performance Bars")
     plt.savefig("example_5_bars.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    show_figure(fig2)
     
     # 箱线图
     fig3 = plot_comparison(data_paths, plot_type="box",
                           title="Performance Distribution")
     plt.savefig("example_5_box.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    show_figure(fig3)
     
     print("所有图表已保存")
 
@@ -3,14 +3,19 @@ ML Plotter Logger 集成使用示例
 展示如何使用集成的实验日志记录和可视化功能
 """
 
+import os
+import matplotlib
+
+# 设置 ML_PLOTTER_HEADLESS=1 时使用非交互的Agg后端
+if os.environ.get("ML_PLOTTER_HEADLESS") == "1":
+    matplotlib.use("Agg")
+
 import numpy as np
 import time
 from ml_plotter_logger import MLPlotterLogger, create_integrated_logger, quick_experiment_plot
 
 def simulate_training_run(config: dict, steps: int = 1000) -> dict:
     """模拟一个训练过程"""
-    results = {'steps': [], 'episodic_return': [], 'actor_loss': [], 'critic_loss': []}
-    
     # 根据配置设置基础性能
     base_reward = 100
     if config.get('algorithm') == 'TD3':
@@ -23,21 +28,23 @@ def simulate_training_run(config: dict, steps: int = 1000) -> dict:
     elif config.get('lr') == 0.0001:
         base_reward -= 10
     
-    # 模拟训练过程
-    for step in range(0, steps, 50):
-        # 奖励随时间增长，但有噪声
-        reward = base_reward + step * 0.1 + np.random.normal(0, 10)
-        
-        # 损失随时间减少
-        actor_loss = 2.0 * np.exp(-step/300) + np.random.normal(0, 0.1)
-        critic_loss = 5.0 * np.exp(-step/200) + np.random.normal(0, 0.2)
-        
-        results['steps'].append(step)
-        results['episodic_return'].append(max(0, reward))  # 确保非负
-        results['actor_loss'].append(max(0, actor_loss))
-        results['critic_loss'].append(max(0, critic_loss))
+    # 模拟训练过程 - 一次性生成所有步数的数据
+    steps_arr = np.arange(0, steps, 50)
+    rng = np.random.default_rng()
+    
+    # 奖励随时间增长，但有噪声
+    reward = base_reward + steps_arr * 0.1 + rng.normal(0, 10, size=steps_arr.size)
     
-    return results
+    # 损失随时间减少
+    actor_loss = 2.0 * np.exp(-steps_arr / 300) + rng.normal(0, 0.1, size=steps_arr.size)
+    critic_loss = 5.0 * np.exp(-steps_arr / 200) + rng.normal(0, 0.2, size=steps_arr.size)
+    
+    return {
+        'steps': steps_arr,
+        'episodic_return': np.maximum(reward, 0),  # 确保非负
+        'actor_loss': np.maximum(actor_loss, 0),
+        'critic_loss': np.maximum(critic_loss, 0)
+    }
 
 def example_1_basic_logging():
     """示例1: 基本的日志记录和可视化"""
@@ -68,13 +75,12 @@ def example_1_basic_logging():
         # 模拟训练
         results = simulate_training_run(config)
         
-        # 记录数据
-        for j, step in enumerate(results['steps']):
-            logger.log(run_id, step, {
-                'episodic_return': results['episodic_return'][j],
-                'actor_loss': results['actor_loss'][j],
-                'critic_loss': results['critic_loss'][j]
-            })
+        # 批量记录数据
+        logger.log_batch(run_id, results['steps'], {
+            'episodic_return': results['episodic_return'],
+            'actor_loss': results['actor_loss'],
+            'critic_loss': results['critic_loss']
+        })
         
         # 结束运行
         logger.finish_run(run_id)
@@ -133,13 +139,12 @@ def example_2_auto_plotting():
         # 模拟训练
         results = simulate_training_run(config, steps=800)
         
-        # 记录数据
-        for j, step in enumerate(results['steps']):
-            logger.log(run_id, step, {
-                'episodic_return': results['episodic_return'][j],
-                'actor_loss': results['actor_loss'][j],
-                'critic_loss': results['critic_loss'][j]
-            })
+        # 批量记录数据
+        logger.log_batch(run_id, results['steps'], {
+            'episodic_return': results['episodic_return'],
+            'actor_loss': results['actor_loss'],
+            'critic_loss': results['critic_loss']
+        })
         
         logger.finish_run(run_id)
     
@@ -187,12 +192,11 @@ def example_3_experiment_comparison():
             # 模拟训练
             results = simulate_training_run(config)
             
-            # 记录数据
-            for j, step in enumerate(results['steps']):
-                logger.log(run_id, step, {
-                    'episodic_return': results['episodic_return'][j],
-                    'actor_loss': results['actor_loss'][j]
-                })
+            # 批量记录数据
+            logger.log_batch(run_id, results['steps'], {
+                'episodic_return': results['episodic_return'],
+                'actor_loss': results['actor_loss']
+            })
             
             logger.finish_run(run_id)
     
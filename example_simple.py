@@ -3,6 +3,13 @@ Simple Logger 使用示例
 展示如何用类似wandb的简洁接口记录和可视化实验
 """
 
+import os
+import matplotlib
+
+# 设置 ML_PLOTTER_HEADLESS=1 时使用非交互的Agg后端
+if os.environ.get("ML_PLOTTER_HEADLESS") == "1":
+    matplotlib.use("Agg")
+
 import numpy as np
 import simple_logger as logger
 
@@ -44,6 +44,6 @@ __all__ = [
     'FONT_SIZES'
 ]
 
-# 设置默认配置
-import matplotlib.pyplot as plt
-plt.style.use('default')  # 确保使用默认样式作为基础
\ No newline at end of file
+# 设置默认配置（不导入pyplot，绘图后端在首次绘图时才加载）
+import matplotlib.style
+matplotlib.style.use('default')  # 确保使用默认样式作为基础
\ No newline at end of file
@@ -4,12 +4,26 @@ ML Plotter - 数据处理工具模块
 """
 
 import os
-import glob
+import csv
+import functools
 import pandas as pd
 import numpy as np
 import scipy.signal as sig
+from scipy.ndimage import uniform_filter1d
 from typing import List, Dict, Tuple, Optional, Union
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # PyArrow为可选依赖，缺失时使用pandas读取
+    pa = pa_csv = None
+
+try:
+    from numba import njit
+except ImportError:  # Numba为可选依赖，缺失时使用SciPy/NumPy实现
+    njit = None
 
 # 常见的列名候选 - 基于原程序的经验
 X_COLUMN_CANDIDATES = [
@@ -36,134 +50,333 @@ Y_COLUMN_CANDIDATES = [
     'zero_vectors'
 ]
 
+def _candidate_ranks(candidates: List[str]) -> Dict[str, int]:
+    """小写候选列名 -> 优先级（列表中越靠前优先级越高）"""
+    ranks = {}
+    for rank, candidate in enumerate(candidates):
+        ranks.setdefault(candidate.lower(), rank)
+    return ranks
+
+# 预编译的列名匹配表，避免每次加载CSV时重复遍历候选列表
+_X_CANDIDATE_RANKS = _candidate_ranks(X_COLUMN_CANDIDATES)
+_Y_CANDIDATE_RANKS = _candidate_ranks(Y_COLUMN_CANDIDATES)
+_Y_SUFFIX_RE = re.compile(
+    '(?:' + '|'.join(re.escape(c) for c in _Y_CANDIDATE_RANKS) + ')$'
+)
+
+if njit is not None:
+    @njit(cache=True)
+    def _ema_kernel(data, alpha, out):
+        """
+        EMA递推的JIT内核，对二维数组逐行计算，结果写入预分配的out
+        
+        NaN的处理与 pandas ewm(adjust=False) 一致：缺失处输出上一个平滑值，
+        之后的观测按间隔衰减旧值的权重后继续递推
+        """
+        for row in range(data.shape[0]):
+            acc = np.nan
+            old_wt = 1.0  # 上一个平滑值的权重，每经过一个缺失值衰减一次
+            for i in range(data.shape[1]):
+                x = data[row, i]
+                if np.isnan(x):
+                    old_wt *= 1.0 - alpha
+                elif np.isnan(acc):
+                    acc = x
+                    old_wt = 1.0
+                elif old_wt == 1.0:
+                    acc = alpha * x + (1.0 - alpha) * acc
+                else:
+                    old_wt *= 1.0 - alpha
+                    acc = (old_wt * acc + alpha * x) / (old_wt + alpha)
+                    old_wt = 1.0
+                out[row, i] = acc
+else:
+    _ema_kernel = None
+
+def _as_float(data: np.ndarray) -> np.ndarray:
+    """转换为浮点数组，保留float32精度，其余类型转为float64"""
+    data = np.asarray(data)
+    return data.astype(np.result_type(data.dtype, np.float32), copy=False)
+
+def _value_dtype(runs: List[Tuple[np.ndarray, np.ndarray]]) -> np.dtype:
+    """多个运行对齐后数值矩阵的数据类型"""
+    return np.result_type(np.float32, *(run_values.dtype for _, run_values in runs))
+
+def _ema(data: np.ndarray, alpha: float) -> np.ndarray:
+    """指数移动平均，等价于 pandas ewm(adjust=False)（含NaN的处理），多维数组沿最后一维计算"""
+    data = _as_float(data)
+    rows = np.ascontiguousarray(data).reshape(-1, data.shape[-1])
+    if _ema_kernel is not None:
+        out = np.empty_like(rows)
+        _ema_kernel(rows, alpha, out)
+        return out.reshape(data.shape)
+    
+    # 以一阶IIR滤波实现，一次调用处理所有行；初始状态取首个样本，使输出从 data[..., 0] 开始
+    zi = ((1.0 - alpha) * rows[:, :1]).astype(rows.dtype)
+    b = np.array([alpha], dtype=rows.dtype)
+    a = np.array([1.0, alpha - 1.0], dtype=rows.dtype)
+    out, _ = sig.lfilter(b, a, rows, axis=-1, zi=zi)
+    
+    # IIR递推遇到NaN后会一直输出NaN；含NaN的行交给 pandas ewm，
+    # 跳过缺失值继续递推
+    nan_rows = np.isnan(rows).any(axis=1)
+    if nan_rows.any():
+        out[nan_rows] = pd.DataFrame(rows[nan_rows].T).ewm(
+            alpha=alpha, adjust=False).mean().to_numpy().T
+    return out.reshape(data.shape)
+
+def _tukey_stats(x: np.ndarray) -> Tuple[float, float, float, float, float, float]:
+    """Tukey箱线图统计量 (mean, q1, med, q3, whislo, whishi)，须线长度为1.5倍IQR"""
+    q1 = np.percentile(x, 25.0)
+    med = np.percentile(x, 50.0)
+    q3 = np.percentile(x, 75.0)
+    iqr = q3 - q1
+    
+    # 须线端点取范围内的最极端数据点，且不越过箱体
+    below_hi = x[x <= q3 + 1.5 * iqr]
+    whishi = q3 if below_hi.size == 0 else max(below_hi.max(), q3)
+    above_lo = x[x >= q1 - 1.5 * iqr]
+    whislo = q1 if above_lo.size == 0 else min(above_lo.min(), q1)
+    
+    return x.mean(), q1, med, q3, whislo, whishi
+
+if njit is not None:
+    _tukey_stats = njit(cache=True)(_tukey_stats)
+
+def _read_csv_header(file_path: str) -> List[str]:
+    """只读取CSV的表头行"""
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+@functools.lru_cache(maxsize=256)
+def _scan_csv_files(folder_path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """扫描文件夹中的CSV文件，按目录修改时间缓存"""
+    with os.scandir(folder_path) as entries:
+        return tuple(sorted(
+            entry.path for entry in entries
+            if entry.name.endswith('.csv') and not entry.name.startswith('.')
+            and entry.is_file()
+        ))
+
+def _list_csv_files(folder_path: str) -> List[str]:
+    """列出文件夹中的CSV文件，目录内容变化时自动重新扫描"""
+    try:
+        mtime_ns = os.stat(folder_path).st_mtime_ns
+    except OSError:
+        return []
+    return list(_scan_csv_files(folder_path, mtime_ns))
+
+@functools.lru_cache(maxsize=256)
+def _scan_subdirs(folder_path: str, mtime_ns: int) -> Tuple[Tuple[str, str], ...]:
+    """扫描文件夹中的子文件夹 (名称, 路径)，按目录修改时间缓存"""
+    with os.scandir(folder_path) as entries:
+        return tuple((entry.name, entry.path) for entry in entries if entry.is_dir())
+
+def _list_subdirs(folder_path: str) -> List[Tuple[str, str]]:
+    """列出文件夹中的子文件夹，增删子文件夹时自动重新扫描"""
+    try:
+        mtime_ns = os.stat(folder_path).st_mtime_ns
+    except OSError:
+        return []
+    return list(_scan_subdirs(folder_path, mtime_ns))
+
+def _find_columns(columns: List[str]) -> Tuple[Optional[str], Optional[str]]:
+    """在列名列表中识别步数列和性能列"""
+    x_col, y_col = None, None
+    x_best, y_best = None, None
+    
+    # 单次遍历列名，按候选优先级保留最佳匹配
+    for col in columns:
+        col_lower = col.lower()
+        
+        # 查找X列（步数列）
+        x_rank = _X_CANDIDATE_RANKS.get(col_lower)
+        if x_rank is not None and (x_best is None or x_rank < x_best):
+            x_col, x_best = col, x_rank
+        
+        # 查找Y列（性能列）- 支持精确匹配和后缀匹配，
+        # 同一候选下精确匹配优先于后缀匹配
+        if not _Y_SUFFIX_RE.search(col_lower):
+            continue
+        key = (min(rank for candidate, rank in _Y_CANDIDATE_RANKS.items()
+                   if col_lower.endswith(candidate)), 1)
+        y_rank = _Y_CANDIDATE_RANKS.get(col_lower)
+        if y_rank is not None:
+            key = min(key, (y_rank, 0))
+        if y_best is None or key < y_best:
+            y_col, y_best = col, key
+    
+    return x_col, y_col
+
+def _read_columns(file_path: str, names: List[str]) -> List[np.ndarray]:
+    """只解析CSV中指定的列，返回float64数组，无法解析的值记为NaN"""
+    try:
+        # 直接按float64解析，跳过逐列的类型推断
+        if pa_csv is not None:
+            table = pa_csv.read_csv(
+                file_path,
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=names,
+                    column_types={name: pa.float64() for name in names}
+                )
+            )
+            return [table.column(name).to_numpy(zero_copy_only=False) for name in names]
+        
+        df = pd.read_csv(file_path, usecols=names, engine='c',
+                         dtype={name: np.float64 for name in names})
+        return [df[name].to_numpy() for name in names]
+    except ValueError:
+        # 列中含有非数值内容时按原始类型读取后再强制转换
+        df = pd.read_csv(file_path, usecols=names)
+        return [pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+                for name in names]
+
+def _clean_run(steps: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """删除含NaN的行，按步数排序并删除重复的步数（保留第一个）"""
+    # 删除NaN值
+    mask = np.isfinite(steps) & np.isfinite(values)
+    steps, values = steps[mask], values[mask]
+    
+    # 日志通常已严格递增，此时无需排序
+    if np.any(steps[1:] <= steps[:-1]):
+        steps, first = np.unique(steps, return_index=True)
+        values = values[first]
+    return steps, values
+
+@functools.lru_cache(maxsize=1024)
+def _load_csv_file(file_path: str, mtime_ns: int, size: int,
+                   value_dtype: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    解析CSV为清洗后的 (steps, values) 数组
+    
+    按 (路径, 修改时间, 文件大小, 数值类型) 缓存，mtime_ns 和 size 仅作为缓存键
+    """
+    try:
+        # 先读取表头识别列名，再只解析需要的两列
+        x_col, y_col = _find_columns(_read_csv_header(file_path))
+        if x_col is None or y_col is None:
+            print(f"Warning: Could not find suitable columns in {file_path}")
+            return None
+        
+        steps, values = _clean_run(*_read_columns(file_path, [x_col, y_col]))
+        
+        # 步数保持float64以精确表示整数步数
+        values = values.astype(value_dtype)
+        
+        # 缓存结果在调用方之间共享，禁止原地修改
+        steps.setflags(write=False)
+        values.setflags(write=False)
+        return steps, values
+        
+    except Exception as e:
+        print(f"Error loading {file_path}: {e}")
+        return None
+
 class DataProcessor:
     """数据处理器 - 统一处理各种数据格式和操作"""
     
     def __init__(self, smooth_window: int = 500):
         self.smooth_window = smooth_window
     
-    def find_columns(self, df: pd.DataFrame) -> Tuple[Optional[str], Optional[str]]:
-        """自动识别步数列和性能列"""
-        x_col, y_col = None, None
-        df_columns_original = list(df.columns)
-        df_columns_lower = [col.lower() for col in df.columns]
-        
-        # 查找X列（步数列）
-        for candidate in X_COLUMN_CANDIDATES:
-            try:
-                idx = df_columns_lower.index(candidate.lower())
-                x_col = df_columns_original[idx]
-                break
-            except ValueError:
-                continue
-        
-        # 查找Y列（性能列）- 支持精确匹配和后缀匹配
-        for candidate_pattern in Y_COLUMN_CANDIDATES:
-            candidate_lower = candidate_pattern.lower()
-            # 精确匹配
-            try:
-                idx = df_columns_lower.index(candidate_lower)
-                y_col = df_columns_original[idx]
-                break
-            except ValueError:
-                # 后缀匹配
-                for i, col_name_lower in enumerate(df_columns_lower):
-                    if col_name_lower.endswith(candidate_lower):
-                        y_col = df_columns_original[i]
-                        break
-                if y_col:
-                    break
-        
-        return x_col, y_col
-    
-    def load_csv_data(self, file_path: str) -> Optional[pd.DataFrame]:
-        """加载单个CSV文件并进行基本清洗"""
+    def find_columns(self, df: Union[pd.DataFrame, List[str]]) -> Tuple[Optional[str], Optional[str]]:
+        """自动识别步数列和性能列，可传入DataFrame或列名列表"""
+        columns = list(df.columns) if isinstance(df, pd.DataFrame) else list(df)
+        return _find_columns(columns)
+    
+    def _load_max_score(self, file_path: str) -> Optional[float]:
+        """返回运行的最大分数，行的清洗与 load_csv_data 一致，但不缓存、不转换数值类型"""
         try:
-            df = pd.read_csv(file_path)
-            x_col, y_col = self.find_columns(df)
-            
+            x_col, y_col = _find_columns(_read_csv_header(file_path))
             if x_col is None or y_col is None:
                 print(f"Warning: Could not find suitable columns in {file_path}")
                 return None
             
-            # 选择相关列并重命名
-            df_processed = df[[x_col, y_col]].copy()
-            df_processed.rename(columns={x_col: 'steps', y_col: 'values'}, inplace=True)
-            
-            # 转换为数值类型
-            df_processed['steps'] = pd.to_numeric(df_processed['steps'], errors='coerce')
-            df_processed['values'] = pd.to_numeric(df_processed['values'], errors='coerce')
-            
-            # 删除NaN值
-            df_processed.dropna(inplace=True)
-            
-            # 按步数排序
-            df_processed.sort_values(by='steps', inplace=True)
-            
-            # 删除重复的步数，保留第一个
-            df_processed.drop_duplicates(subset=['steps'], keep='first', inplace=True)
-            
-            return df_processed
+            # 与曲线使用相同的行：跳过步数或数值缺失的行，重复步数只取第一次记录
+            _, values = _clean_run(*_read_columns(file_path, [x_col, y_col]))
+            if values.size == 0:
+                return None
+            return values.max()
             
         except Exception as e:
             print(f"Error loading {file_path}: {e}")
             return None
     
-    def load_folder_data(self, folder_path: str) -> Optional[Dict[str, np.ndarray]]:
-        """加载文件夹中的所有CSV文件并处理"""
+    def load_csv_data(self, file_path: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        加载单个CSV文件并进行基本清洗，返回 (steps, values) 数组
+        
+        结果按 (路径, 修改时间, 文件大小) 缓存，文件变化后自动重新解析；
+        返回的数组为只读，多次调用间共享。
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            print(f"Error loading {file_path}: {e}")
+            return None
+        # 曲线数值使用float32，减半后续插值和平滑的内存带宽
+        return _load_csv_file(file_path, stat.st_mtime_ns, stat.st_size, 'float32')
+    
+    def load_folder_data(self, folder_path: str,
+                         interpolate: bool = True) -> Optional[Dict[str, np.ndarray]]:
+        """加载文件夹中的所有CSV文件并处理，interpolate含义见 align_and_aggregate_runs"""
         if not os.path.isdir(folder_path):
             print(f"Warning: {folder_path} is not a directory")
             return None
         
-        csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
+        csv_files = _list_csv_files(folder_path)
         if not csv_files:
             print(f"Warning: No CSV files found in {folder_path}")
             return None
         
-        all_runs = []
-        for csv_file in csv_files:
-            df = self.load_csv_data(csv_file)
-            if df is not None and not df.empty:
-                all_runs.append(df)
+        # CSV解析在C层释放GIL，多线程并行读取各个种子文件
+        with ThreadPoolExecutor(max_workers=min(8, len(csv_files))) as executor:
+            loaded = list(executor.map(self.load_csv_data, csv_files))
+        all_runs = [run for run in loaded if run is not None and run[0].size > 0]
         
         if not all_runs:
             print(f"Warning: No valid data loaded from {folder_path}")
             return None
         
-        return self.align_and_aggregate_runs(all_runs)
+        return self.align_and_aggregate_runs(all_runs, interpolate=interpolate)
     
-    def align_and_aggregate_runs(self, runs: List[pd.DataFrame]) -> Dict[str, np.ndarray]:
-        """对齐多个运行的数据并计算统计量"""
+    def align_and_aggregate_runs(self, runs: List[Tuple[np.ndarray, np.ndarray]],
+                                 interpolate: bool = True) -> Dict[str, np.ndarray]:
+        """
+        对齐多个运行的数据并计算统计量
+        
+        Args:
+            runs: (steps, values) 数组对列表，steps已排序且无重复
+            interpolate: True时将各运行线性插值到公共步数轴；
+                False时只统计每个步数上实际记录的数据
+        """
         try:
-            # 使用外连接对齐所有运行的数据
-            aligned_data = []
-            for run_df in runs:
-                run_df.set_index('steps', inplace=True)
-                aligned_data.append(run_df['values'])
-            
-            # 合并所有数据
-            combined_df = pd.concat(aligned_data, axis=1, join='outer')
-            combined_df.sort_index(inplace=True)
-            
-            # 线性插值填充缺失值
-            combined_df.interpolate(method='linear', limit_direction='both', inplace=True)
+            # 所有运行步数的并集作为公共步数轴
+            steps = np.unique(np.concatenate([run_steps for run_steps, _ in runs]))
             
-            # 删除仍然为NaN的行
-            combined_df.dropna(how='all', inplace=True)
-            
-            if combined_df.empty:
+            if steps.size == 0:
                 return None
             
-            # 计算统计量
-            steps = combined_df.index.to_numpy()
-            means = combined_df.mean(axis=1).to_numpy()
-            stds = combined_df.std(axis=1, ddof=0).to_numpy() if combined_df.shape[1] > 1 else np.zeros_like(means)
+            n_runs = len(runs)
+            if interpolate:
+                # 线性插值到公共步数轴，范围外取端点值
+                aligned = np.empty((n_runs, steps.size), dtype=_value_dtype(runs))
+                for row, (run_steps, run_values) in zip(aligned, runs):
+                    row[:] = np.interp(steps, run_steps, run_values)
+                means = aligned.mean(axis=0)
+                stds = aligned.std(axis=0, ddof=0) if n_runs > 1 else np.zeros_like(means)
+            else:
+                # 缺失的步数保留为NaN，按列忽略NaN计算统计量
+                aligned = np.full((n_runs, steps.size), np.nan, dtype=_value_dtype(runs))
+                for row, (run_steps, run_values) in zip(aligned, runs):
+                    row[np.searchsorted(steps, run_steps)] = run_values
+                means = np.nanmean(aligned, axis=0)
+                stds = np.nanstd(aligned, axis=0, ddof=0)
             
             return {
                 'steps': steps,
                 'means': means,
                 'stds': stds,
-                'n_runs': combined_df.shape[1]
+                'n_runs': n_runs
             }
             
         except Exception as e:
@@ -171,22 +384,54 @@ class DataProcessor:
             return None
     
     def smooth_data(self, data: np.ndarray, method: str = 'ema') -> np.ndarray:
-        """数据平滑处理"""
-        if len(data) <= 1:
+        """数据平滑处理，多维数组沿最后一维逐行平滑"""
+        n = np.shape(data)[-1]
+        if n <= 1:
             return data
         
         if method == 'ema':
             # 指数移动平均
-            if len(data) > self.smooth_window and self.smooth_window > 1:
-                return pd.Series(data).ewm(span=self.smooth_window, adjust=False).mean().to_numpy()
+            if n > self.smooth_window and self.smooth_window > 1:
+                return _ema(data, 2.0 / (self.smooth_window + 1))
+        elif method == 'boxcar':
+            # 滑动窗口均值
+            if n > self.smooth_window and self.smooth_window > 1:
+                return uniform_filter1d(_as_float(data),
+                                        size=self.smooth_window, mode='nearest')
         elif method == 'savgol':
             # Savitzky-Golay滤波
-            window_length = min(31, len(data) if len(data) % 2 == 1 else len(data) - 1)
+            window_length = min(31, n if n % 2 == 1 else n - 1)
             if window_length >= 3:
                 return sig.savgol_filter(data, window_length=window_length, polyorder=2)
         
         return data
     
+    def box_stats(self, values: List[float], label: Optional[str] = None) -> Dict:
+        """计算箱线图统计量，返回可直接传给 Axes.bxp 的字典"""
+        x = np.asarray(values, dtype=np.float64)
+        x = x[np.isfinite(x)]
+        mean, q1, med, q3, whislo, whishi = _tukey_stats(x)
+        
+        return {
+            'label': label,
+            'mean': mean,
+            'med': med,
+            'q1': q1,
+            'q3': q3,
+            'whislo': whislo,
+            'whishi': whishi,
+            'fliers': x[(x < whislo) | (x > whishi)]
+        }
+    
+    def group_mean_std(self, groups: List[List[float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """各组数据的均值和标准差，不等长的组以NaN补齐后一次归约"""
+        sizes = np.fromiter(map(len, groups), dtype=np.intp, count=len(groups))
+        padded = np.full((len(groups), sizes.max(initial=0)), np.nan)
+        # 按行展开的有效位置掩码，一次性填入所有组的数据
+        padded[np.arange(padded.shape[1]) < sizes[:, None]] = np.concatenate(
+            [np.asarray(g, dtype=np.float64) for g in groups] or [np.empty(0)])
+        return np.nanmean(padded, axis=1), np.nanstd(padded, axis=1)
+
     def normalize_data(self, data: np.ndarray, method: str = 'minmax') -> np.ndarray:
         """数据归一化"""
         if method == 'minmax':
@@ -202,14 +447,16 @@ class DataProcessor:
     
     def extract_max_scores(self, folder_path: str) -> List[float]:
         """提取文件夹中所有运行的最大分数"""
-        csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
+        csv_files = _list_csv_files(folder_path)
         max_scores = []
         
-        for csv_file in csv_files:
-            df = self.load_csv_data(csv_file)
-            if df is not None and not df.empty:
-                max_score = df['values'].max()
-                max_scores.append(max_score)
+        if not csv_files:
+            return max_scores
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(csv_files))) as executor:
+            for max_score in executor.map(self._load_max_score, csv_files):
+                if max_score is not None:
+                    max_scores.append(max_score)
         
         return max_scores
     
@@ -226,17 +473,15 @@ class DataProcessor:
             for condition in condition_names:
                 condition_path = os.path.join(base_path, condition)
                 if os.path.isdir(condition_path):
-                    csv_files = glob.glob(os.path.join(condition_path, "*.csv"))
+                    csv_files = _list_csv_files(condition_path)
                     if csv_files:
                         discovered[condition] = condition_path
         else:
-            # 自动发现包含CSV文件的子文件夹
-            for item in os.listdir(base_path):
-                item_path = os.path.join(base_path, item)
-                if os.path.isdir(item_path):
-                    csv_files = glob.glob(os.path.join(item_path, "*.csv"))
-                    if csv_files:
-                        discovered[item] = item_path
+            # 自动发现包含CSV文件的子文件夹 - 子文件夹列表和其中的CSV列表均按修改时间缓存
+            for item, item_path in _list_subdirs(base_path):
+                csv_files = _list_csv_files(item_path)
+                if csv_files:
+                    discovered[item] = item_path
         
         return discovered
 
@@ -4,27 +4,136 @@ ML Plotter - 主要绘图类
 """
 
 import os
-import matplotlib.pyplot as plt
+import matplotlib
 import numpy as np
-from typing import List, Dict, Optional, Union, Tuple
+from typing import List, Dict, Optional, Union, Tuple, TYPE_CHECKING
 import warnings
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numexpr as ne
+except ImportError:  # numexpr为可选依赖，缺失时使用NumPy计算
+    ne = None
 
 from .styles import style_manager, FIGURE_SIZES, LINE_CONFIG, ALPHA_CONFIG, FONT_SIZES
-from .data_utils import data_processor
+from .data_utils import data_processor, _load_csv_file
+
+# matplotlib.pyplot 在首次绘图时才导入，避免导入本库时加载绘图后端
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# 水平箱线图参数：matplotlib 3.10 起以 orientation 取代 vert
+_HORIZONTAL_BXP = ({'orientation': 'horizontal'}
+                   if tuple(int(v) for v in matplotlib.__version__.split('.')[:2]) >= (3, 10)
+                   else {'vert': False})
+
+# 模块级缓存的容量上限（条目数），超出时淘汰最久未使用的条目
+_CACHE_MAXSIZE = 64
+_CACHE_LOCK = threading.Lock()
+
+def _cache_get(cache: OrderedDict, key, signature):
+    """签名一致时返回缓存条目 (签名, 结果) 并标记为最近使用，否则返回None"""
+    with _CACHE_LOCK:
+        cached = cache.get(key)
+        if signature is None or cached is None or cached[0] != signature:
+            return None
+        cache.move_to_end(key)
+        return cached
+
+def _cache_put(cache: OrderedDict, key, signature, result):
+    """写入缓存条目，超出容量时淘汰最久未使用的条目"""
+    with _CACHE_LOCK:
+        cache[key] = (signature, result)
+        cache.move_to_end(key)
+        while len(cache) > _CACHE_MAXSIZE:
+            cache.popitem(last=False)
+
+# 文件夹数据缓存: (加载方法名, 路径) -> (文件夹签名, 加载结果)
+_FOLDER_CACHE: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], object]]" = OrderedDict()
+
+def _folder_signature(path: str) -> Optional[Tuple[int, int]]:
+    """文件夹内容签名：目录本身及其中文件的最新修改时间"""
+    try:
+        with os.scandir(path) as entries:
+            latest = max((entry.stat().st_mtime_ns for entry in entries), default=0)
+        return os.stat(path).st_mtime_ns, latest
+    except OSError:
+        return None
+
+def _cached_folder_load(method: str, path: str):
+    """调用 data_processor 的文件夹加载方法，文件夹未变化时直接返回缓存结果"""
+    signature = _folder_signature(path)
+    cached = _cache_get(_FOLDER_CACHE, (method, path), signature)
+    if cached is not None:
+        return cached[1]
+    
+    result = getattr(data_processor, method)(path)
+    if signature is not None:
+        _cache_put(_FOLDER_CACHE, (method, path), signature, result)
+    return result
+
+# 平滑结果缓存: (路径, 平滑窗口, 平滑方法) -> (文件夹签名, (steps, means, stds))
+_SMOOTH_CACHE: "OrderedDict[Tuple[str, int, str], Tuple[Tuple[int, int], tuple]]" = OrderedDict()
+
+def _cached_smoothed(path: str, data: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """返回文件夹数据EMA平滑后的 (steps, means, stds)，文件夹未变化时直接返回缓存结果"""
+    signature = _folder_signature(path)
+    key = (path, data_processor.smooth_window, 'ema')
+    cached = _cache_get(_SMOOTH_CACHE, key, signature)
+    if cached is not None:
+        return cached[1]
+    
+    # 均值和标准差合并为一个数组一次完成平滑
+    means, stds = data_processor.smooth_data(np.stack([data['means'], data['stds']]), method='ema')
+    means.flags.writeable = False
+    stds.flags.writeable = False
+    result = (data['steps'], means, stds)
+    if signature is not None:
+        _cache_put(_SMOOTH_CACHE, key, signature, result)
+    return result
+
+def _load_conditions(method: str, paths: List[str]) -> list:
+    """并行加载多个条件的文件夹数据，结果顺序与paths一致"""
+    if len(paths) <= 1:
+        return [_cached_folder_load(method, path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+        return list(executor.map(lambda path: _cached_folder_load(method, path), paths))
+
+def _fill_labels(labels: Optional[List[str]], data_dict: Dict[str, str]) -> List[str]:
+    """标签列表与条件一一对应，缺少的标签用条件名补齐，多余的标签忽略"""
+    labels = list(labels or [])[:len(data_dict)]
+    return labels + list(data_dict)[len(labels):]
+
+def _downsample(steps: np.ndarray, means: np.ndarray, stds: np.ndarray,
+                target: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """等间隔抽取至多target个点（保留首尾），曲线已平滑时视觉上无差别"""
+    if steps.size <= target:
+        return steps, means, stds
+    idx = np.linspace(0, steps.size - 1, target).astype(np.int64)
+    return steps[idx], means[idx], stds[idx]
 
 class MLPlotter:
     """机器学习实验结果绘图器"""
     
-    def __init__(self, style: str = "academic", smooth_window: int = 500):
+    def __init__(self, style: str = "academic", smooth_window: int = 500,
+                 reuse_figure: bool = False):
         """
         初始化绘图器
         
         Args:
             style: 绘图风格，默认为"academic"
             smooth_window: 数据平滑窗口大小
+            reuse_figure: 是否在连续绘图间复用同一Figure（清空后重绘），
+                适合批量保存图表；开启后上一次返回的Figure会被覆盖
         """
         self.style = style
         self.smooth_window = smooth_window
+        self.reuse_figure = reuse_figure
+        self._fig, self._ax = None, None
+        # 标准差阴影上下界的复用缓冲区，形状 (2, N)
+        self._band = None
         data_processor.smooth_window = smooth_window
         
         # 应用默认样式
@@ -42,7 +151,7 @@ class MLPlotter:
                            save_path: Optional[str] = None,
                            figsize: Tuple[float, float] = FIGURE_SIZES["default"],
                            legend_loc: str = 'upper left',
-                           legend_bbox: Optional[Tuple[float, float]] = None) -> plt.Figure:
+                           legend_bbox: Optional[Tuple[float, float]] = None) -> "Figure":
         """
         绘制训练曲线对比图
         
@@ -88,14 +197,18 @@ class MLPlotter:
             labels = list(data_dict.keys())
         
         # 创建图表
-        fig, ax = plt.subplots(figsize=figsize)
+        fig, ax = self._new_axes(figsize)
+        
+        # 预先获取所有标签的颜色和线型
+        colors = style_manager.get_colors(labels)
+        linestyles = style_manager.get_linestyles(labels)
+        
+        # 并行加载所有条件的数据
+        all_data = _load_conditions('load_folder_data', list(data_dict.values()))
         
         # 绘制每个条件的曲线
-        for i, (condition, path) in enumerate(data_dict.items()):
-            label = labels[i] if i < len(labels) else condition
-            
-            # 加载数据
-            data = data_processor.load_folder_data(path)
+        for (condition, path), label, color, linestyle, data in zip(
+                data_dict.items(), labels, colors, linestyles, all_data):
             if data is None:
                 print(f"Warning: Could not load data from {path}")
                 continue
@@ -104,32 +217,42 @@ class MLPlotter:
             means = data['means']
             stds = data['stds']
             
-            # 应用步数限制
-            if max_steps is not None:
-                mask = steps <= max_steps
-                steps = steps[mask]
-                means = means[mask]
-                stds = stds[mask]
+            # 应用步数限制 - steps已排序，只需确定截断位置
+            k = steps.size
+            if max_steps is not None and k and steps[-1] > max_steps:
+                k = np.searchsorted(steps, max_steps, side='right')
             
-            if len(steps) == 0:
+            if k == 0:
                 continue
             
-            # 数据平滑
-            if smooth:
-                means = data_processor.smooth_data(means, method='ema')
-                stds = data_processor.smooth_data(stds, method='ema')
+            # 数据平滑 - EMA为因果滤波，先平滑全序列再截断与先截断再平滑结果相同，
+            # 因此直接复用全序列的平滑缓存（截断后长度不足平滑窗口时不平滑）
+            smoothed = smooth and k > data_processor.smooth_window
+            if smoothed:
+                steps, means, stds = _cached_smoothed(path, data)
+            
+            steps, means, stds = steps[:k], means[:k], stds[:k]
             
-            # 获取颜色和线型
-            color = style_manager.get_color(label)
-            linestyle = style_manager.get_linestyle(label)
+            # 平滑后的曲线超出输出分辨率的点不影响画面，按300dpi下每像素列约4个点抽稀；
+            # 未平滑的原始曲线不抽稀，避免丢失尖峰和产生混叠
+            if smoothed:
+                steps, means, stds = _downsample(steps, means, stds, int(4 * figsize[0] * 300))
             
             # 绘制主线
             ax.plot(steps, means, label=label, color=color, linestyle=linestyle,
                    linewidth=LINE_CONFIG["width"])
             
             # 绘制标准差阴影
-            if show_std and np.any(stds > 0):
-                ax.fill_between(steps, means - stds, means + stds,
+            if show_std and stds.max() > 0:
+                band = self._band_buffer(steps.size, means.dtype)
+                if ne is not None:
+                    # 长序列上分块多线程计算，减少内存带宽瓶颈
+                    ne.evaluate("means - stds", out=band[0])
+                    ne.evaluate("means + stds", out=band[1])
+                else:
+                    np.subtract(means, stds, out=band[0])
+                    np.add(means, stds, out=band[1])
+                ax.fill_between(steps, band[0], band[1],
                               color=color, alpha=ALPHA_CONFIG["shade"])
         
         # 应用样式
@@ -147,16 +270,38 @@ class MLPlotter:
         # 设置科学计数法
         style_manager.setup_scientific_notation(ax)
         
-        # 调整布局
-        plt.tight_layout()
-        
         # 保存图表
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            fig.savefig(save_path, dpi=300, bbox_inches='tight')
             print(f"Plot saved to {save_path}")
         
         return fig
     
+    def _new_axes(self, figsize: Tuple[float, float]):
+        """创建绘图用的Figure和Axes；复用模式下尺寸相同时清空上一次的Figure并重建坐标轴"""
+        import matplotlib.pyplot as plt
+        
+        if (self.reuse_figure and self._fig is not None
+                and plt.fignum_exists(self._fig.number)
+                and tuple(self._fig.get_size_inches()) == tuple(figsize)):
+            # ax.clear() 不会重置脊线、网格等样式，上一张图的设置会残留，因此重建坐标轴
+            self._fig.clear()
+            self._ax = self._fig.add_subplot()
+            plt.figure(self._fig.number)
+            return self._fig, self._ax
+        
+        # 紧凑布局由布局引擎在绘制时完成，保存时与bbox_inches='tight'共用同一次绘制
+        fig, ax = plt.subplots(figsize=figsize, layout='tight')
+        if self.reuse_figure:
+            self._fig, self._ax = fig, ax
+        return fig, ax
+    
+    def _band_buffer(self, n: int, dtype: np.dtype) -> np.ndarray:
+        """返回 (2, n) 的阴影上下界缓冲区，容量不足或类型不同时重新分配"""
+        if self._band is None or self._band.shape[1] < n or self._band.dtype != dtype:
+            self._band = np.empty((2, n), dtype=dtype)
+        return self._band[:, :n]
+    
     def plot_performance_bars(self,
                             data_paths: Union[List[str], Dict[str, str]],
                             labels: Optional[List[str]] = None,
@@ -166,7 +311,7 @@ class MLPlotter:
                             save_path: Optional[str] = None,
                             figsize: Tuple[float, float] = FIGURE_SIZES["default"],
                             show_legend: bool = False,
-                            legend_loc: str = 'upper right') -> plt.Figure:
+                            legend_loc: str = 'upper right') -> "Figure":
         """
         绘制性能对比柱状图
         
@@ -192,34 +337,32 @@ class MLPlotter:
         else:
             raise ValueError("data_paths must be list or dict")
         
-        if labels is None:
-            labels = list(data_dict.keys())
+        labels = _fill_labels(labels, data_dict)
         
         # 提取最大分数
-        means = []
-        stds = []
+        valid_scores = []
         valid_labels = []
         
-        for i, (condition, path) in enumerate(data_dict.items()):
-            label = labels[i] if i < len(labels) else condition
-            max_scores = data_processor.extract_max_scores(path)
-            
+        all_max_scores = _load_conditions('extract_max_scores', list(data_dict.values()))
+        
+        for condition, label, max_scores in zip(data_dict, labels, all_max_scores):
             if max_scores:
-                means.append(np.mean(max_scores))
-                stds.append(np.std(max_scores))
+                valid_scores.append(max_scores)
                 valid_labels.append(label)
             else:
                 print(f"Warning: No valid scores found for {condition}")
         
-        if not means:
+        if not valid_scores:
             raise ValueError("No valid data found for plotting")
         
+        means, stds = data_processor.group_mean_std(valid_scores)
+        
         # 创建图表
-        fig, ax = plt.subplots(figsize=figsize)
+        fig, ax = self._new_axes(figsize)
         
-        # 绘制柱状图
+        # 绘制柱状图 - 使用数值位置而非分类X轴，重复的标签也各占一个位置
         x_pos = np.arange(len(valid_labels))
-        colors = [style_manager.get_color(label) for label in valid_labels]
+        colors = style_manager.get_colors(valid_labels)
         
         bars = ax.bar(x_pos, means, yerr=stds, capsize=5,
                      color=colors, alpha=0.8, 
@@ -243,11 +386,9 @@ class MLPlotter:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        plt.tight_layout()
-        
         # 保存图表
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            fig.savefig(save_path, dpi=300, bbox_inches='tight')
             print(f"Plot saved to {save_path}")
         
         return fig
@@ -258,7 +399,7 @@ class MLPlotter:
                           title: str = "",
                           xlabel: str = "Max Episode Return",
                           save_path: Optional[str] = None,
-                          figsize: Tuple[float, float] = FIGURE_SIZES["default"]) -> plt.Figure:
+                          figsize: Tuple[float, float] = FIGURE_SIZES["default"]) -> "Figure":
         """
         绘制箱线图对比
         
@@ -281,17 +422,15 @@ class MLPlotter:
         else:
             raise ValueError("data_paths must be list or dict")
         
-        if labels is None:
-            labels = list(data_dict.keys())
+        labels = _fill_labels(labels, data_dict)
         
         # 收集所有分数数据
         all_scores = []
         valid_labels = []
         
-        for i, (condition, path) in enumerate(data_dict.items()):
-            label = labels[i] if i < len(labels) else condition
-            max_scores = data_processor.extract_max_scores(path)
-            
+        all_max_scores = _load_conditions('extract_max_scores', list(data_dict.values()))
+        
+        for condition, label, max_scores in zip(data_dict, labels, all_max_scores):
             if max_scores:
                 all_scores.append(max_scores)
                 valid_labels.append(label)
@@ -302,14 +441,16 @@ class MLPlotter:
             raise ValueError("No valid data found for plotting")
         
         # 创建图表
-        fig, ax = plt.subplots(figsize=figsize)
+        fig, ax = self._new_axes(figsize)
         
         # 绘制箱线图
-        colors = [style_manager.get_color(label) for label in valid_labels]
+        colors = style_manager.get_colors(valid_labels)
         
-        bp = ax.boxplot(all_scores, vert=False, patch_artist=True,
-                       showmeans=True, meanline=True, showfliers=True,
-                       labels=valid_labels, widths=0.6)
+        bxpstats = [data_processor.box_stats(scores, label)
+                    for scores, label in zip(all_scores, valid_labels)]
+        bp = ax.bxp(bxpstats, patch_artist=True, **_HORIZONTAL_BXP,
+                    showmeans=True, meanline=True, showfliers=True,
+                    widths=0.6)
         
         # 设置颜色
         for patch, color in zip(bp['boxes'], colors):
@@ -326,16 +467,14 @@ class MLPlotter:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        plt.tight_layout()
-        
         # 保存图表
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            fig.savefig(save_path, dpi=300, bbox_inches='tight')
             print(f"Plot saved to {save_path}")
         
         return fig
     
-    def quick_plot(self, data_path: str, **kwargs) -> plt.Figure:
+    def quick_plot(self, data_path: str, **kwargs) -> "Figure":
         """
         快速绘图 - 自动选择最合适的图表类型
         
@@ -349,16 +488,20 @@ class MLPlotter:
         # 自动发现条件
         conditions = data_processor.auto_discover_conditions(data_path)
         
-        if len(conditions) == 1:
-            # 单条件，绘制单一训练曲线
-            return self.plot_training_curves(data_path, **kwargs)
-        elif len(conditions) > 1:
-            # 多条件，绘制对比图
-            return self.plot_training_curves(conditions, **kwargs)
-        else:
+        if not conditions:
             raise ValueError(f"No valid conditions found in {data_path}")
+        
+        # 单条件绘制单一训练曲线，多条件绘制对比图；
+        # 直接传入已发现的条件，避免plot_training_curves再次扫描目录
+        return self.plot_training_curves(conditions, **kwargs)
+    
+    def clear_cache(self):
+        """清空已加载的文件夹数据、平滑结果和CSV解析缓存"""
+        _FOLDER_CACHE.clear()
+        _SMOOTH_CACHE.clear()
+        _load_csv_file.cache_clear()
     
-    def save_all_formats(self, fig: plt.Figure, base_path: str):
+    def save_all_formats(self, fig: "Figure", base_path: str):
         """
         保存图表为多种格式
         
@@ -367,19 +510,33 @@ class MLPlotter:
             base_path: 基础保存路径（不含扩展名）
         """
         formats = ['png', 'pdf', 'svg']
-        for fmt in formats:
-            save_path = f"{base_path}.{fmt}"
-            fig.savefig(save_path, dpi=300, bbox_inches='tight', format=fmt)
-            print(f"Saved {save_path}")
+        
+        # 布局和紧凑边界框只计算一次，各格式共用，保存期间暂时关闭布局引擎避免重复布局
+        layout_engine = fig.get_layout_engine()
+        fig.draw_without_rendering()
+        pad_inches = matplotlib.rcParams['savefig.pad_inches']
+        if isinstance(pad_inches, str):
+            bbox = 'tight'
+        else:
+            bbox = fig.get_tightbbox().padded(pad_inches)
+        
+        fig.set_layout_engine('none')
+        try:
+            for fmt in formats:
+                save_path = f"{base_path}.{fmt}"
+                fig.savefig(save_path, dpi=300, bbox_inches=bbox, format=fmt)
+                print(f"Saved {save_path}")
+        finally:
+            fig.set_layout_engine(layout_engine)
 
 # 便捷函数
-def quick_plot(data_path: str, **kwargs) -> plt.Figure:
+def quick_plot(data_path: str, **kwargs) -> "Figure":
     """快速绘图函数"""
     plotter = MLPlotter()
     return plotter.quick_plot(data_path, **kwargs)
 
 def plot_comparison(data_paths: Union[List[str], Dict[str, str]], 
-                   plot_type: str = "curves", **kwargs) -> plt.Figure:
+                   plot_type: str = "curves", **kwargs) -> "Figure":
     """绘制对比图"""
     plotter = MLPlotter()
     
@@ -3,9 +3,11 @@ ML Plotter - 样式配置模块
 保持与原画图程序一致的专业学术风格
 """
 
-import matplotlib.pyplot as plt
+import functools
+import matplotlib
+import matplotlib.cm as mcm
 import matplotlib.ticker as mticker
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 # 颜色映射 - 与原程序保持一致
 COLOR_MAP: Dict[str, str] = {
@@ -61,6 +63,11 @@ FIGURE_SIZES = {
     "wide": (12, 4)
 }
 
+@functools.lru_cache(maxsize=256)
+def _lower(label: str) -> str:
+    """标签的小写形式，同一标签只转换一次"""
+    return label.lower()
+
 class StyleManager:
     """样式管理器 - 统一管理所有样式设置"""
     
@@ -69,19 +76,27 @@ class StyleManager:
     
     def setup_matplotlib_defaults(self):
         """设置matplotlib默认样式"""
-        plt.rcParams['xtick.direction'] = 'in'
-        plt.rcParams['ytick.direction'] = 'in'
-        plt.rcParams['font.size'] = FONT_SIZES["tick"]
+        matplotlib.rcParams['xtick.direction'] = 'in'
+        matplotlib.rcParams['ytick.direction'] = 'in'
+        matplotlib.rcParams['font.size'] = FONT_SIZES["tick"]
     
     def get_color(self, label: str) -> str:
         """获取标签对应的颜色"""
-        label_lower = label.lower()
-        return COLOR_MAP.get(label_lower, COLOR_MAP["default"])
+        return COLOR_MAP.get(_lower(label), COLOR_MAP["default"])
     
     def get_linestyle(self, label: str) -> str:
         """获取标签对应的线型"""
-        label_lower = label.lower()
-        return LINESTYLE_MAP.get(label_lower, LINESTYLE_MAP["default"])
+        return LINESTYLE_MAP.get(_lower(label), LINESTYLE_MAP["default"])
+    
+    def get_colors(self, labels: List[str]) -> List[str]:
+        """一次性获取多个标签对应的颜色"""
+        default = COLOR_MAP["default"]
+        return [COLOR_MAP.get(_lower(label), default) for label in labels]
+    
+    def get_linestyles(self, labels: List[str]) -> List[str]:
+        """一次性获取多个标签对应的线型"""
+        default = LINESTYLE_MAP["default"]
+        return [LINESTYLE_MAP.get(_lower(label), default) for label in labels]
     
     def apply_academic_style(self, ax, title: str = "", 
                            xlabel: str = "Steps", ylabel: str = "Performance",
@@ -134,10 +149,14 @@ class StyleManager:
     
     def setup_scientific_notation(self, ax):
         """设置科学计数法格式"""
-        formatter = mticker.ScalarFormatter(useMathText=True)
+        # 线性坐标轴自带ScalarFormatter，直接原地配置；格式化器带有所属坐标轴的状态，不能在图表间共享
+        formatter = ax.xaxis.get_major_formatter()
+        if type(formatter) is not mticker.ScalarFormatter:
+            formatter = mticker.ScalarFormatter()
+            ax.xaxis.set_major_formatter(formatter)
+        formatter.set_useMathText(True)
         formatter.set_scientific(True)
         formatter.set_powerlimits((-3, 4))
-        ax.xaxis.set_major_formatter(formatter)
     
     def get_default_colors(self, n_colors: int) -> list:
         """获取默认颜色列表"""
@@ -146,7 +165,7 @@ class StyleManager:
         else:
             # 如果需要更多颜色，使用matplotlib默认颜色循环
             colors = list(COLOR_MAP.values())
-            default_colors = plt.cm.tab10.colors
+            default_colors = mcm.tab10.colors
             for i in range(n_colors - len(colors)):
                 colors.append(default_colors[i % len(default_colors)])
             return colors
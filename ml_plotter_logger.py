@@ -10,11 +10,16 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Any
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 
 # 导入现有的模块
 from experiment_logger import ExperimentLogger, get_logger
 from ml_plotter import MLPlotter, style_manager
+from ml_plotter.data_utils import data_processor
+
+# log_batch 直接写入 ExperimentLogger 日志表的列
+_BATCH_LOG_COLUMNS = ('experiment_id', 'run_id', 'step', 'metric_name', 'metric_value')
 
 class MLPlotterLogger:
     """集成的实验日志记录和可视化器"""
@@ -28,18 +33,120 @@ class MLPlotterLogger:
         self.plots_dir = self.log_dir / "plots"
         self.plots_dir.mkdir(exist_ok=True)
         
+        # run_id -> experiment_id，供批量写入使用
+        self._run_experiments: Dict[str, str] = {}
+        
+        # 整个实例共用一个数据库连接，避免每次查询重新打开数据库
+        self._conn = self._connect()
+        
+        # 为按实验查询的语句建立索引
+        self._ensure_indexes()
+        
         print(f"🎨 ML Plotter Logger 初始化完成")
         print(f"   日志目录: {self.log_dir}")
         print(f"   图表目录: {self.plots_dir}")
     
+    def _connect(self) -> sqlite3.Connection:
+        """打开日志数据库连接：WAL模式下读写互不阻塞，临时数据和页缓存放在内存中"""
+        conn = sqlite3.connect(self.logger.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        return conn
+    
+    def _ensure_indexes(self):
+        """创建导出和绘图查询使用的复合索引"""
+        try:
+            with self._conn:
+                self._conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_logs_experiment_run 
+                    ON logs(experiment_id, run_id, step)
+                ''')
+                self._conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_logs_experiment_metric 
+                    ON logs(experiment_id, metric_name, run_id, step)
+                ''')
+        except sqlite3.OperationalError as e:
+            # 日志表由 ExperimentLogger 管理，尚未创建时跳过
+            print(f"⚠️ 无法创建日志索引: {e}")
+    
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
     def start_run(self, experiment_id: str, run_id: str, params: Dict[str, Any], tags: List[str] = None):
         """开始实验运行"""
+        self._run_experiments[run_id] = experiment_id
         return self.logger.start_run(experiment_id, run_id, params, tags)
     
     def log(self, run_id: str, step: int, metrics: Dict[str, float]):
         """记录实验指标"""
         return self.logger.log(run_id, step, metrics)
     
+    def log_batch(self, run_id: str, steps: Union[List[int], np.ndarray],
+                  metrics: Dict[str, Union[List[float], np.ndarray]]):
+        """
+        批量记录实验指标，所有数据在一个事务中写入
+        
+        本实例启动的运行直接写入 ExperimentLogger 的日志表（写入前检查表结构），
+        其他运行逐步调用 ExperimentLogger.log
+        
+        Args:
+            run_id: 运行ID
+            steps: 步数序列
+            metrics: 指标字典 {指标名称: 与steps等长的数值序列}
+        """
+        steps = np.asarray(steps).tolist()
+        columns = {name: np.asarray(values, dtype=float).tolist()
+                   for name, values in metrics.items()}
+        
+        for name, values in columns.items():
+            if len(values) != len(steps):
+                raise ValueError(f"指标 {name} 的长度与 steps 不一致")
+        
+        experiment_id = self._run_experiments.get(run_id)
+        if experiment_id is None:
+            # 非本实例启动的运行，逐步记录
+            for i, step in enumerate(steps):
+                self.logger.log(run_id, step, {name: values[i] for name, values in columns.items()})
+            return
+        
+        # 批量写入直接使用 ExperimentLogger 的日志表，写入前确认表结构与预期一致
+        self._check_logs_schema()
+        
+        rows = [(experiment_id, run_id, step, name, value)
+                for name, values in columns.items()
+                for step, value in zip(steps, values)]
+        
+        with self._conn:
+            self._conn.executemany('''
+                INSERT INTO logs (experiment_id, run_id, step, metric_name, metric_value)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+    
+    def _check_logs_schema(self):
+        """
+        确认 ExperimentLogger 的日志表与批量写入兼容：包含写入的各列，
+        其余必填列都有默认值；不兼容时报错而不是写入不完整的记录
+        """
+        table_info = self._conn.execute('PRAGMA table_info(logs)').fetchall()
+        columns = {name for _, name, *_ in table_info}
+        missing = [name for name in _BATCH_LOG_COLUMNS if name not in columns]
+        # 未写入的列需可为空、有默认值或为自增主键
+        missing += [name for _, name, _, notnull, default, pk in table_info
+                    if name not in _BATCH_LOG_COLUMNS and notnull and default is None and not pk]
+        if missing:
+            raise RuntimeError(
+                f"ExperimentLogger 的日志表结构与 log_batch 不兼容（列: {', '.join(missing)}），"
+                f"请改用 log() 逐步记录")
+    
     def finish_run(self, run_id: str):
         """结束实验运行"""
         return self.logger.finish_run(run_id)
@@ -68,42 +175,94 @@ class MLPlotterLogger:
         print(f"📤 导出实验数据: {experiment_id}")
         print(f"   发现 {len(runs)} 个运行")
         
+        # 每个运行记录过的指标，决定其CSV的列；列按指标首次出现的步数排列，同一步内按名称排列
+        run_metrics = {run['run_id']: [] for run in runs}
+        for run_id, metric_name in self._conn.execute('''
+            SELECT run_id, metric_name 
+            FROM logs 
+            WHERE experiment_id = ?
+            GROUP BY run_id, metric_name
+            ORDER BY MIN(step), metric_name
+        ''', (experiment_id,)):
+            if run_id in run_metrics:
+                run_metrics[run_id].append(metric_name)
+        
+        # 按 (run_id, step) 顺序分块读取，逐块透视后追加写入各运行的CSV，不在内存中保留整个实验
+        # 空值也一并读取：只记录了空值的步和指标同样保留为CSV中的行和列
+        written = set()
+        pending = None
+        for chunk in pd.read_sql_query('''
+            SELECT run_id, step, metric_name, metric_value 
+            FROM logs 
+            WHERE experiment_id = ?
+            ORDER BY run_id, step, rowid
+        ''', self._conn, params=(experiment_id,), chunksize=100_000):
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index=True)
+            
+            # 块末尾的 (run_id, step) 可能延续到下一块，留到下一块一起透视
+            tail = ((chunk['run_id'] == chunk['run_id'].iat[-1])
+                    & (chunk['step'] == chunk['step'].iat[-1]))
+            pending = chunk[tail]
+            self._append_run_csvs(chunk[~tail], experiment_id, run_metrics, output_dir, written)
+        
+        if pending is not None:
+            self._append_run_csvs(pending, experiment_id, run_metrics, output_dir, written)
+        
         for run_info in runs:
             run_id = run_info['run_id']
-            
-            # 从数据库获取该运行的所有数据
-            conn = sqlite3.connect(self.logger.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT step, metric_name, metric_value 
-                FROM logs 
-                WHERE experiment_id = ? AND run_id = ?
-                ORDER BY step, metric_name
-            ''', (experiment_id, run_id))
-            
-            # 转换为DataFrame
-            data = {}
-            for row in cursor.fetchall():
-                step, metric_name, metric_value = row
-                if step not in data:
-                    data[step] = {'Step': step}
-                data[step][f'{experiment_id} - {metric_name}'] = metric_value
-            
-            conn.close()
-            
-            if data:
-                # 创建DataFrame并保存
-                df = pd.DataFrame(list(data.values()))
-                df = df.sort_values('Step').reset_index(drop=True)
-                
-                csv_path = output_dir / f"{run_id}.csv"
-                df.to_csv(csv_path, index=False)
-                print(f"   ✅ {run_id} -> {csv_path}")
+            if run_id in written:
+                print(f"   ✅ {run_id} -> {output_dir / f'{run_id}.csv'}")
         
         print(f"📁 CSV文件已导出到: {output_dir}")
         return str(output_dir)
     
+    def _append_run_csvs(self, rows: pd.DataFrame, experiment_id: str,
+                         run_metrics: Dict[str, List[str]], output_dir: Path, written: set):
+        """将一块长表数据透视为 Step x 指标 的宽表，追加写入对应运行的CSV"""
+        if rows.empty:
+            return
+        
+        # 同一步重复记录的指标取最后一次，再直接 unstack，避免 pivot_table 的分组聚合开销
+        wide = (rows.drop_duplicates(['run_id', 'step', 'metric_name'], keep='last')
+                    .set_index(['run_id', 'step', 'metric_name'])['metric_value']
+                    .unstack('metric_name'))
+        
+        for run_id, run_df in wide.groupby(level='run_id', sort=False):
+            if run_id not in run_metrics:
+                continue
+            
+            # 列与该运行的全部指标对齐，保证各块写入的列一致
+            run_df = run_df.droplevel('run_id').reindex(columns=run_metrics[run_id])
+            run_df.columns = [f'{experiment_id} - {metric_name}' for metric_name in run_df.columns]
+            run_df.index.name = 'Step'
+            
+            first = run_id not in written
+            run_df.to_csv(output_dir / f"{run_id}.csv", mode='w' if first else 'a', header=first)
+            written.add(run_id)
+    
+    def _plot_path(self, experiment_id: str, metric_name: str,
+                   group_by: Optional[Union[str, List[str]]], suffix: str = '') -> Path:
+        """单个指标图表的保存路径"""
+        plot_filename = f"{experiment_id}_{metric_name}{suffix}"
+        if group_by:
+            if isinstance(group_by, str):
+                plot_filename += f"_by_{group_by}"
+            else:
+                plot_filename += f"_by_{'_'.join(group_by)}"
+        return self.plots_dir / f"{plot_filename}.png"
+    
+    def _save_figure(self, fig: plt.Figure, plot_path: Path, plot_kwargs: Dict):
+        """
+        保存图表
+        
+        plot_kwargs 中的 save_dpi（默认300）和 tight（默认True，裁剪为紧凑边界框）
+        可用于批量出图时降低分辨率或跳过边界框测量
+        """
+        dpi = plot_kwargs.get('save_dpi', 300)
+        bbox_inches = 'tight' if plot_kwargs.get('tight', True) else None
+        fig.savefig(plot_path, dpi=dpi, bbox_inches=bbox_inches)
+    
     def plot_training_curves(self, 
                            experiment_id: str,
                            metric_name: str = 'episodic_return',
@@ -127,7 +286,14 @@ class MLPlotterLogger:
         """
         # 获取指标数据
         metrics_data = self.logger.get_metrics(experiment_id, metric_name, group_by)
-        
+        return self._render_training_curves(experiment_id, metric_name, group_by, metrics_data,
+                                            title, save_plot, **plot_kwargs)
+    
+    def _render_training_curves(self, experiment_id: str, metric_name: str,
+                                group_by: Optional[Union[str, List[str]]], metrics_data: Dict,
+                                title: Optional[str] = None, save_plot: bool = True,
+                                ax: Optional[plt.Axes] = None, **plot_kwargs) -> plt.Figure:
+        """根据已查询的指标数据绘制训练曲线"""
         if not metrics_data:
             raise ValueError(f"未找到实验 {experiment_id} 的指标 {metric_name}")
         
@@ -155,43 +321,41 @@ class MLPlotterLogger:
                 title = f"{experiment_id}: {metric_name}"
         
         # 使用MLPlotter绘制
-        fig = self._plot_from_data_dict(data_dict, title, metric_name, **plot_kwargs)
+        fig = self._plot_from_data_dict(data_dict, title, metric_name, ax=ax, **plot_kwargs)
         
         # 保存图表
         if save_plot:
-            plot_filename = f"{experiment_id}_{metric_name}"
-            if group_by:
-                if isinstance(group_by, str):
-                    plot_filename += f"_by_{group_by}"
-                else:
-                    plot_filename += f"_by_{'_'.join(group_by)}"
-            plot_filename += ".png"
-            
-            plot_path = self.plots_dir / plot_filename
-            fig.savefig(plot_path, dpi=300, bbox_inches='tight')
+            plot_path = self._plot_path(experiment_id, metric_name, group_by)
+            self._save_figure(fig, plot_path, plot_kwargs)
             print(f"💾 图表已保存: {plot_path}")
         
         return fig
     
     def _plot_from_data_dict(self, data_dict: Dict[str, pd.DataFrame], 
-                           title: str, ylabel: str, **plot_kwargs) -> plt.Figure:
-        """从数据字典绘制图表"""
+                           title: str, ylabel: str, ax: Optional[plt.Axes] = None,
+                           **plot_kwargs) -> plt.Figure:
+        """从数据字典绘制图表，传入ax时直接绘制到该坐标轴上"""
         # 创建图表
-        figsize = plot_kwargs.get('figsize', (10, 6))
-        fig, ax = plt.subplots(figsize=figsize)
+        if ax is None:
+            figsize = plot_kwargs.get('figsize', (10, 6))
+            fig, ax = plt.subplots(figsize=figsize, layout='tight')
+        else:
+            fig = ax.figure
+        
+        smooth = plot_kwargs.get('smooth', True)
+        
+        # 一次性获取所有分组的颜色和线型
+        colors = style_manager.get_colors(data_dict)
+        linestyles = style_manager.get_linestyles(data_dict)
         
         # 绘制每个分组
-        for group_key, df in data_dict.items():
+        for (group_key, df), color, linestyle in zip(data_dict.items(), colors, linestyles):
             steps = df['Step'].values
-            values = df.iloc[:, 1].values  # 第二列是指标值
+            # 第二列是指标值 - 平滑和绘图以float32进行，减半内存带宽
+            values = df.iloc[:, 1].to_numpy(dtype=np.float32)
             
-            # 获取颜色
-            color = style_manager.get_color(group_key)
-            linestyle = style_manager.get_linestyle(group_key)
-            
-            # 数据平滑
-            if plot_kwargs.get('smooth', True):
-                from ml_plotter.data_utils import data_processor
+            # 数据平滑 - EMA由编译的递推内核（或SciPy lfilter）一次完成
+            if smooth:
                 values = data_processor.smooth_data(values, method='ema')
             
             # 绘制曲线
@@ -214,7 +378,6 @@ class MLPlotterLogger:
         # 设置科学计数法
         style_manager.setup_scientific_notation(ax)
         
-        plt.tight_layout()
         return fig
     
     def plot_comparison_bars(self,
@@ -240,7 +403,14 @@ class MLPlotterLogger:
         """
         # 获取汇总统计
         stats = self.logger.get_summary_stats(experiment_id, metric_name, group_by)
-        
+        return self._render_comparison_bars(experiment_id, metric_name, group_by, stats,
+                                            title, save_plot, **plot_kwargs)
+    
+    def _render_comparison_bars(self, experiment_id: str, metric_name: str,
+                                group_by: Optional[Union[str, List[str]]], stats: Dict,
+                                title: Optional[str] = None, save_plot: bool = True,
+                                ax: Optional[plt.Axes] = None, **plot_kwargs) -> plt.Figure:
+        """根据已查询的汇总统计绘制性能对比柱状图"""
         if not stats:
             raise ValueError(f"未找到实验 {experiment_id} 的指标 {metric_name}")
         
@@ -257,12 +427,15 @@ class MLPlotterLogger:
             title = f"{experiment_id}: Final {metric_name}"
         
         # 创建图表
-        figsize = plot_kwargs.get('figsize', (10, 6))
-        fig, ax = plt.subplots(figsize=figsize)
+        if ax is None:
+            figsize = plot_kwargs.get('figsize', (10, 6))
+            fig, ax = plt.subplots(figsize=figsize, layout='tight')
+        else:
+            fig = ax.figure
         
         # 绘制柱状图
         x_pos = np.arange(len(labels))
-        colors = [style_manager.get_color(label) for label in labels]
+        colors = style_manager.get_colors(labels)
         
         bars = ax.bar(x_pos, means, yerr=stds, capsize=5,
                      color=colors, alpha=0.8, 
@@ -281,20 +454,10 @@ class MLPlotterLogger:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        plt.tight_layout()
-        
         # 保存图表
         if save_plot:
-            plot_filename = f"{experiment_id}_{metric_name}_bars"
-            if group_by:
-                if isinstance(group_by, str):
-                    plot_filename += f"_by_{group_by}"
-                else:
-                    plot_filename += f"_by_{'_'.join(group_by)}"
-            plot_filename += ".png"
-            
-            plot_path = self.plots_dir / plot_filename
-            fig.savefig(plot_path, dpi=300, bbox_inches='tight')
+            plot_path = self._plot_path(experiment_id, metric_name, group_by, '_bars')
+            self._save_figure(fig, plot_path, plot_kwargs)
             print(f"💾 图表已保存: {plot_path}")
         
         return fig
@@ -304,7 +467,10 @@ class MLPlotterLogger:
                            metrics: Optional[List[str]] = None,
                            group_by: Optional[Union[str, List[str]]] = None,
                            plot_types: List[str] = ['curves', 'bars'],
-                           save_plots: bool = True) -> Dict[str, plt.Figure]:
+                           save_plots: bool = True,
+                           reuse_figure: bool = False,
+                           processes: int = 1,
+                           **plot_kwargs) -> Dict[str, Union[plt.Figure, Path]]:
         """
         自动为实验生成所有相关图表
         
@@ -314,56 +480,119 @@ class MLPlotterLogger:
             group_by: 分组参数
             plot_types: 图表类型列表 ['curves', 'bars', 'summary']
             save_plots: 是否保存图表
+            reuse_figure: 复用同一个Figure逐个绘制并保存，结束后关闭，适合批量出图；
+                此时返回各图表的保存路径而非图表对象
+            processes: 大于1时在该数量的进程中并行绘制并保存曲线图和柱状图，
+                返回各图表的保存路径；仅在 save_plots=True 时生效
+            **plot_kwargs: 传递给各图表的绘图参数，如 save_dpi、tight
             
         Returns:
-            图表字典 {plot_name: figure}
+            图表字典 {plot_name: figure}，复用Figure或多进程绘制时为 {plot_name: 保存路径}
         """
         print(f"🎨 自动生成实验图表: {experiment_id}")
         
-        # 自动检测指标
+        # 自动检测指标；摘要需要实验的全部指标，两者共用同一次查询
+        all_metrics = None
+        if metrics is None or 'summary' in plot_types:
+            all_metrics = self._get_metric_names(experiment_id)
         if metrics is None:
-            conn = sqlite3.connect(self.logger.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT DISTINCT metric_name 
-                FROM logs 
-                WHERE experiment_id = ?
-            ''', (experiment_id,))
-            metrics = [row[0] for row in cursor.fetchall()]
-            conn.close()
+            metrics = all_metrics
         
         print(f"   检测到指标: {metrics}")
         
         figures = {}
-        
+        summary_metrics = all_metrics if 'summary' in plot_types else []
+        
+        # 多进程绘制：数据仍在当前进程中查询，绘图和保存交给进程池
+        # （matplotlib 不支持多线程同时绘图，每个工作进程使用自己的 MLPlotterLogger）
+        executor = None
+        if processes > 1 and save_plots:
+            executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_render_worker,
+                                           initargs=(str(self.log_dir),))
+        
+        # 批量出图时只创建一次Figure，每张图绘制前清空并重建坐标轴
+        # （ax.cla() 不会重置脊线、网格等样式，上一张图的设置会残留）
+        shared_fig = None
+        if reuse_figure and executor is None:
+            shared_fig = plt.figure(figsize=plot_kwargs.get('figsize', (10, 6)), layout='tight')
+        
+        # 数据查询在当前线程依次进行：ExperimentLogger 是外部模块，未保证其查询方法可以跨线程并发调用
+        # 柱状图与摘要使用相同的统计数据，每个指标只查询一次
+        stats_data = {}
+        def get_stats(metric):
+            if metric not in stats_data:
+                stats_data[metric] = self.logger.get_summary_stats(experiment_id, metric, group_by)
+            return stats_data[metric]
+        
+        futures = {}
         for metric in metrics:
             try:
                 # 训练曲线
                 if 'curves' in plot_types:
-                    fig_curves = self.plot_training_curves(
-                        experiment_id, metric, group_by, 
-                        save_plot=save_plots
-                    )
-                    figures[f"{metric}_curves"] = fig_curves
+                    curves_data = self.logger.get_metrics(experiment_id, metric, group_by)
+                    if executor is not None:
+                        futures[f"{metric}_curves"] = executor.submit(
+                            _render_in_worker, 'curves', experiment_id, metric, group_by,
+                            curves_data, plot_kwargs)
+                    else:
+                        shared_ax = self._reset_figure(shared_fig)
+                        fig_curves = self._render_training_curves(
+                            experiment_id, metric, group_by, curves_data,
+                            save_plot=save_plots, ax=shared_ax, **plot_kwargs
+                        )
+                        if shared_fig is None:
+                            figures[f"{metric}_curves"] = fig_curves
+                        elif save_plots:
+                            figures[f"{metric}_curves"] = self._plot_path(experiment_id, metric, group_by)
                 
                 # 性能对比柱状图
                 if 'bars' in plot_types:
-                    fig_bars = self.plot_comparison_bars(
-                        experiment_id, metric, group_by,
-                        save_plot=save_plots
-                    )
-                    figures[f"{metric}_bars"] = fig_bars
+                    if executor is not None:
+                        futures[f"{metric}_bars"] = executor.submit(
+                            _render_in_worker, 'bars', experiment_id, metric, group_by,
+                            get_stats(metric), plot_kwargs)
+                    else:
+                        shared_ax = self._reset_figure(shared_fig)
+                        fig_bars = self._render_comparison_bars(
+                            experiment_id, metric, group_by, get_stats(metric),
+                            save_plot=save_plots, ax=shared_ax, **plot_kwargs
+                        )
+                        if shared_fig is None:
+                            figures[f"{metric}_bars"] = fig_bars
+                        elif save_plots:
+                            figures[f"{metric}_bars"] = self._plot_path(experiment_id, metric, group_by, '_bars')
                     
             except Exception as e:
                 print(f"   ⚠️ 绘制 {metric} 时出错: {e}")
         
+        # 按提交顺序收集进程池中保存的图表路径
+        if executor is not None:
+            for plot_name, future in futures.items():
+                try:
+                    figures[plot_name] = future.result()
+                except Exception as e:
+                    print(f"   ⚠️ 绘制 {plot_name} 时出错: {e}")
+            executor.shutdown()
+        
+        if shared_fig is not None:
+            plt.close(shared_fig)
+        
         # 生成实验摘要
         if 'summary' in plot_types:
-            self.generate_experiment_summary(experiment_id, group_by, save_plots)
+            summary_stats = {metric: get_stats(metric) for metric in summary_metrics}
+            self._render_experiment_summary(experiment_id, group_by, summary_stats, save_plots)
         
         print(f"✅ 完成！生成了 {len(figures)} 个图表")
         return figures
     
+    @staticmethod
+    def _reset_figure(fig: Optional[plt.Figure]) -> Optional[plt.Axes]:
+        """清空复用的Figure并返回新的坐标轴；未复用时返回None"""
+        if fig is None:
+            return None
+        fig.clear()
+        return fig.add_subplot()
+    
     def generate_experiment_summary(self, 
                                   experiment_id: str,
                                   group_by: Optional[Union[str, List[str]]] = None,
@@ -379,18 +608,28 @@ class MLPlotterLogger:
         Returns:
             摘要文本
         """
-        print(f"📋 生成实验摘要: {experiment_id}")
-        
         # 获取所有指标
-        conn = sqlite3.connect(self.logger.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        stats_by_metric = {
+            metric: self.logger.get_summary_stats(experiment_id, metric, group_by)
+            for metric in self._get_metric_names(experiment_id)
+        }
+        return self._render_experiment_summary(experiment_id, group_by, stats_by_metric, save_summary)
+    
+    def _get_metric_names(self, experiment_id: str) -> List[str]:
+        """获取实验记录过的所有指标名称"""
+        cursor = self._conn.execute('''
             SELECT DISTINCT metric_name 
             FROM logs 
             WHERE experiment_id = ?
         ''', (experiment_id,))
-        metrics = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        return [row[0] for row in cursor.fetchall()]
+    
+    def _render_experiment_summary(self, experiment_id: str,
+                                   group_by: Optional[Union[str, List[str]]],
+                                   stats_by_metric: Dict[str, Dict],
+                                   save_summary: bool = True) -> str:
+        """根据已查询的各指标统计数据生成摘要报告"""
+        print(f"📋 生成实验摘要: {experiment_id}")
         
         # 生成摘要文本
         summary_lines = []
@@ -406,12 +645,10 @@ class MLPlotterLogger:
             summary_lines.append("")
         
         # 为每个指标生成统计
-        for metric in metrics:
+        for metric, stats in stats_by_metric.items():
             summary_lines.append(f"## 指标: {metric}")
             summary_lines.append("")
             
-            stats = self.logger.get_summary_stats(experiment_id, metric, group_by)
-            
             # 按最终性能排序
             sorted_stats = sorted(stats.items(), key=lambda x: x[1]['final'], reverse=True)
             
@@ -469,25 +706,22 @@ class MLPlotterLogger:
         
         # 收集所有实验的数据
         all_data = {}
-        
         for exp_id in experiment_ids:
             metrics_data = self.logger.get_metrics(exp_id, metric_name, group_by=None)
             
-            # 聚合同一实验的所有运行
-            all_steps = []
-            all_values = []
+            # 聚合同一实验的所有运行 - 各运行的数组一次拼接，不逐个扩展Python列表
+            runs = list(metrics_data.values())
+            if not runs:
+                continue
+            steps = np.concatenate([np.asarray(run['steps']) for run in runs])
+            values = np.concatenate([np.asarray(run['values'], dtype=np.float64) for run in runs])
             
-            for run_data in metrics_data.values():
-                all_steps.extend(run_data['steps'])
-                all_values.extend(run_data['values'])
-            
-            if all_steps:
-                # 创建DataFrame
-                df = pd.DataFrame({
-                    'Step': all_steps,
-                    f'{exp_id} - {metric_name}': all_values
-                })
-                all_data[exp_id] = df
+            if steps.size:
+                # 拼接结果已是新数组，直接包装为DataFrame，不再复制一份
+                all_data[exp_id] = pd.DataFrame({
+                    'Step': steps,
+                    f'{exp_id} - {metric_name}': values
+                }, copy=False)
         
         if not all_data:
             raise ValueError("未找到任何有效的实验数据")
@@ -503,12 +737,37 @@ class MLPlotterLogger:
         if save_plot:
             plot_filename = f"comparison_{'_vs_'.join(experiment_ids)}_{metric_name}.png"
             plot_path = self.plots_dir / plot_filename
-            fig.savefig(plot_path, dpi=300, bbox_inches='tight')
+            self._save_figure(fig, plot_path, plot_kwargs)
             print(f"💾 对比图已保存: {plot_path}")
         
         return fig
 
 
+# auto_plot_experiment 多进程绘制时，每个工作进程自己的 MLPlotterLogger
+_worker_logger = None
+
+def _init_render_worker(log_dir: str):
+    """进程池初始化：使用非交互的Agg后端，并为本进程创建 MLPlotterLogger（不重复打印初始化信息）"""
+    global _worker_logger
+    import io
+    import contextlib
+    
+    plt.switch_backend('Agg')
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_logger = MLPlotterLogger(log_dir)
+
+def _render_in_worker(kind: str, experiment_id: str, metric: str,
+                      group_by: Optional[Union[str, List[str]]], data: Dict, plot_kwargs: Dict) -> Path:
+    """在工作进程中绘制并保存单个图表，返回保存路径"""
+    if kind == 'curves':
+        fig = _worker_logger._render_training_curves(experiment_id, metric, group_by, data, **plot_kwargs)
+        suffix = ''
+    else:
+        fig = _worker_logger._render_comparison_bars(experiment_id, metric, group_by, data, **plot_kwargs)
+        suffix = '_bars'
+    plt.close(fig)
+    return _worker_logger._plot_path(experiment_id, metric, group_by, suffix)
+
 # 便捷函数
 def create_integrated_logger(log_dir: str = "experiment_logs") -> MLPlotterLogger:
     """创建集成的实验日志记录和可视化器"""
@@ -37,12 +37,18 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=[
-        "matplotlib>=3.3.0",
+        "matplotlib>=3.6.0",
         "pandas>=1.1.0",
         "numpy>=1.19.0",
         "scipy>=1.5.0",
     ],
     extras_require={
+        "fast": [
+            "pyarrow>=6.0",
+            "numba>=0.53",
+            "numexpr>=2.7",
+            "orjson>=3.0",
+        ],
         "dev": [
             "pytest>=6.0",
             "pytest-cov>=2.0",
@@ -3,20 +3,41 @@ Simple ML Logger - 类似wandb的简洁接口
 极简的实验记录和可视化系统
 """
 
+from __future__ import annotations
+
 import os
 import json
+import math
+import time
+import atexit
 import sqlite3
-import pandas as pd
-import numpy as np
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-import matplotlib.pyplot as plt
-from ml_plotter import MLPlotter
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
+
+# pandas/numpy/matplotlib 只在 plot() 和 summary() 中按需导入，
+# 训练循环中只调用 init/log/finish 时不承担这些库的导入开销
+if TYPE_CHECKING:
+    import numpy as np
+    import matplotlib.pyplot as plt
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时使用标准库json
+    orjson = None
 
 # 全局状态
 _current_run = None
 _db_path = None
 _project_name = None
+_conn = None  # 当前运行期间保持打开的数据库连接
+
+# 写入缓冲区：log() 只追加记录，攒满、距上次写入超过 _FLUSH_INTERVAL 秒或结束运行时
+# 再一次性写入数据库，其他进程（如查看进度的notebook）最多延迟这么久看到新数据
+# （相当于内存暂存表：每次落盘是一个事务内的批量追加，无需额外的 :memory: 库中转）
+_buffer = []
+_BUF_MAX = 10000
+_FLUSH_INTERVAL = 5.0
+_last_flush = time.monotonic()
 
 def init(project: str = "ml_experiments", name: Optional[str] = None, config: Optional[Dict] = None):
     """
@@ -27,9 +48,7 @@ def init(project: str = "ml_experiments", name: Optional[str] = None, config: Op
         name: 运行名称，默认自动生成
         config: 实验配置参数
     """
-    global _current_run, _db_path, _project_name
-    
-    import time
+    global _current_run, _db_path, _project_name, _conn, _last_flush
     
     _project_name = project
     
@@ -40,6 +59,13 @@ def init(project: str = "ml_experiments", name: Optional[str] = None, config: Op
     # 数据库路径
     _db_path = project_dir / "experiments.db"
     
+    # 打开本次运行使用的数据库连接，WAL模式下写入不阻塞读取
+    if _conn is not None:
+        _flush()
+        _conn.close()
+    _conn = _connect(_db_path, check_same_thread=False)
+    _last_flush = time.monotonic()
+    
     # 初始化数据库
     _init_database()
     
@@ -52,6 +78,8 @@ def init(project: str = "ml_experiments", name: Optional[str] = None, config: Op
         'project': project,
         'name': name,
         'config': config or {},
+        # 配置在运行期间不变，只序列化一次
+        'config_json': _dumps_config(config or {}),
         'step': 0
     }
     
@@ -77,33 +105,43 @@ def log(metrics: Dict[str, float], step: Optional[int] = None):
         step = _current_run['step']
         _current_run['step'] += 1
     
-    # 保存到数据库
-    conn = sqlite3.connect(_db_path)
-    cursor = conn.cursor()
-    
-    for metric_name, value in metrics.items():
-        cursor.execute('''
-            INSERT INTO logs (project, run_name, step, metric_name, metric_value, config)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            _current_run['project'],
-            _current_run['name'], 
-            step,
-            metric_name,
-            float(value),
-            json.dumps(_current_run['config'])
-        ))
-    
-    conn.commit()
-    conn.close()
+    # 写入缓冲区，攒满或超过写入间隔后批量写入数据库；
+    # 记录时间在此时取得（与 CURRENT_TIMESTAMP 格式相同的UTC时间），而不是写入数据库的时间
+    project, name, config_json = _current_run['project'], _current_run['name'], _current_run['config_json']
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+    _buffer.extend((project, name, step, metric_name, float(value), config_json, timestamp)
+                   for metric_name, value in metrics.items())
+    
+    if len(_buffer) >= _BUF_MAX or time.monotonic() - _last_flush >= _FLUSH_INTERVAL:
+        _flush()
+
+def _flush():
+    """将缓冲区中的记录在一个事务内写入数据库"""
+    global _last_flush
+    
+    _last_flush = time.monotonic()
+    if not _buffer or _conn is None:
+        return
+    
+    with _conn:
+        _conn.executemany('''
+            INSERT INTO logs (project, run_name, step, metric_name, metric_value, config, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', _buffer)
+    _buffer.clear()
 
 def finish():
     """结束当前运行"""
-    global _current_run
+    global _current_run, _conn
     
     if _current_run:
         print(f"✅ Finished run: {_current_run['project']}/{_current_run['name']}")
         _current_run = None
+    
+    if _conn is not None:
+        _flush()
+        _conn.close()
+        _conn = None
 
 def plot(project: str, 
          metric: str = "loss",
@@ -130,40 +168,54 @@ def plot(project: str,
     if not db_path.exists():
         raise FileNotFoundError(f"项目 {project} 不存在")
     
-    # 从数据库读取数据
-    conn = sqlite3.connect(db_path)
+    import numpy as np
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    from ml_plotter import MLPlotter
     
-    # 构建查询
-    query = '''
-        SELECT run_name, step, metric_value, config
-        FROM logs 
-        WHERE project = ? AND metric_name = ?
-    '''
-    params = [project, metric]
+    # 当前运行尚未写入的记录先落盘
+    _flush()
     
-    if runs:
-        placeholders = ','.join(['?' for _ in runs])
-        query += f' AND run_name IN ({placeholders})'
-        params.extend(runs)
+    # 从数据库读取数据；项目已导出为Parquet且与数据库同步时改读Parquet
+    conn, owned = _project_conn(db_path)
+    parquet_dir = _synced_parquet(conn, db_path)
+    columns = ['run_name', 'step', 'metric_value'] + (['config'] if group_by else [])
     
-    query += ' ORDER BY run_name, step'
-    
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    
-    if df.empty:
-        raise ValueError(f"未找到项目 {project} 的指标 {metric}")
-    
-    # 解析配置
-    df['config'] = df['config'].apply(json.loads)
+    if parquet_dir is not None:
+        df = _read_parquet(parquet_dir, columns, metric=metric, runs=runs)
+    else:
+        # 构建查询
+        query = f'''
+            SELECT {', '.join(columns)}
+            FROM logs 
+            WHERE project = ? AND metric_name = ?
+        '''
+        params = [project, metric]
+        
+        if runs:
+            placeholders = ','.join(['?' for _ in runs])
+            query += f' AND run_name IN ({placeholders})'
+            params.extend(runs)
+        
+        query += ' ORDER BY run_name, step'
+        
+        df = pd.read_sql_query(query, conn, params=params)
     
     # 分组逻辑
-    if group_by:
-        # 按指定参数分组
-        df['group'] = df['config'].apply(lambda x: f"{group_by}={x.get(group_by, 'unknown')}")
+    if group_by and not df.empty:
+        # 按指定参数分组 - 标签按配置文本生成，每种配置只解析一次；
+        # 同名的运行（如同一秒内启动的默认名称）配置不同时仍分到各自的组
+        df['group'] = df['config'].map(_config_groups(df['config'].unique(), group_by))
+        # 配置列只用于生成分组标签，不随数据保留
+        del df['config']
     else:
         # 按运行名称分组
         df['group'] = df['run_name']
+    if owned:
+        conn.close()
+    
+    if df.empty:
+        raise ValueError(f"未找到项目 {project} 的指标 {metric}")
     
     # 创建图表
     plotter = MLPlotter()
@@ -176,10 +228,8 @@ def plot(project: str,
         # 计算平均值和标准差（如果有多个运行）
         if group_by:
             # 按步数聚合
-            agg_data = group_data.groupby('step')['metric_value'].agg(['mean', 'std']).reset_index()
-            steps = agg_data['step']
-            means = agg_data['mean']
-            stds = agg_data['std'].fillna(0)
+            steps, means, stds = _step_mean_std(group_data['step'].to_numpy(),
+                                                group_data['metric_value'].to_numpy(dtype=np.float64))
             
             # 绘制主线
             ax.plot(steps, means, label=group_name, linewidth=3)
@@ -237,74 +287,272 @@ def summary(project: str, group_by: Optional[str] = None):
     if not db_path.exists():
         raise FileNotFoundError(f"项目 {project} 不存在")
     
-    conn = sqlite3.connect(db_path)
+    import pandas as pd
+    
+    # 当前运行尚未写入的记录先落盘
+    _flush()
     
-    # 获取所有指标
-    metrics_df = pd.read_sql_query('''
-        SELECT DISTINCT metric_name FROM logs WHERE project = ?
-    ''', conn, params=[project])
+    conn, owned = _project_conn(db_path)
+    parquet_dir = _synced_parquet(conn, db_path)
+    
+    # 获取所有指标；已同步的Parquet数据集一次读入后按指标拆分
+    if parquet_dir is not None:
+        columns = ['run_name', 'metric_name', 'metric_value'] + (['config'] if group_by else [])
+        logs = _read_parquet(parquet_dir, columns)
+        if group_by:
+            configs = logs['config'].unique()
+        metric_frames = dict(tuple(logs.groupby('metric_name', sort=True)))
+        metric_names = list(metric_frames)
+    else:
+        metric_names = pd.read_sql_query('''
+            SELECT DISTINCT metric_name FROM logs WHERE project = ?
+        ''', conn, params=[project])['metric_name']
+        if group_by:
+            configs = [config for config, in conn.execute(
+                'SELECT DISTINCT config FROM logs WHERE project = ?', [project])]
+    
+    # 各配置的分组标签，所有指标共用
+    config_groups = _config_groups(configs, group_by) if group_by else {}
     
     print(f"\n📊 项目摘要: {project}")
     print("=" * 50)
     
-    for metric in metrics_df['metric_name']:
+    for metric in metric_names:
         print(f"\n📈 指标: {metric}")
         
         # 获取该指标的数据
-        df = pd.read_sql_query('''
-            SELECT run_name, metric_value, config
-            FROM logs 
-            WHERE project = ? AND metric_name = ?
-            ORDER BY run_name, step
-        ''', conn, params=[project, metric])
-        
+        if parquet_dir is not None:
+            df = metric_frames[metric]
+        else:
+            df = pd.read_sql_query(f'''
+                SELECT run_name, metric_value{', config' if group_by else ''}
+                FROM logs 
+                WHERE project = ? AND metric_name = ?
+                ORDER BY run_name, step
+            ''', conn, params=[project, metric])
+
         if df.empty:
             continue
-            
-        # 解析配置
-        df['config'] = df['config'].apply(json.loads)
-        
-        # 计算每个运行的最终值
-        final_values = df.groupby('run_name')['metric_value'].last()
         
         if group_by:
-            # 按参数分组
-            df['group'] = df['config'].apply(lambda x: f"{group_by}={x.get(group_by, 'unknown')}")
+            # 计算每个运行的最终值，同名的运行按配置区分
+            final_values = df.groupby(['run_name', 'config'])['metric_value'].last()
             
-            # 计算分组统计
-            group_stats = []
-            for group_name in df['group'].unique():
-                group_runs = df[df['group'] == group_name]['run_name'].unique()
-                group_values = final_values[final_values.index.isin(group_runs)]
-                
-                group_stats.append({
-                    'group': group_name,
-                    'mean': group_values.mean(),
-                    'std': group_values.std(),
-                    'count': len(group_values),
-                    'best': group_values.max()
-                })
+            # 按参数分组，一次计算所有分组的统计
+            groups = final_values.index.get_level_values('config').map(config_groups)
+            group_stats = final_values.groupby(groups, sort=False).agg(['mean', 'std', 'size', 'max'])
             
             # 按最佳性能排序
-            group_stats.sort(key=lambda x: x['best'], reverse=True)
+            group_stats = group_stats.sort_values('max', ascending=False, kind='stable')
             
-            for stat in group_stats:
-                print(f"  🔹 {stat['group']}")
-                print(f"     最佳: {stat['best']:.4f}")
+            for group_name, stat in group_stats.iterrows():
+                print(f"  🔹 {group_name}")
+                print(f"     最佳: {stat['max']:.4f}")
                 print(f"     平均: {stat['mean']:.4f} ± {stat['std']:.4f}")
-                print(f"     运行数: {stat['count']}")
+                print(f"     运行数: {int(stat['size'])}")
         else:
-            # 显示所有运行
+            # 计算每个运行的最终值，显示所有运行
+            final_values = df.groupby('run_name')['metric_value'].last()
             sorted_runs = final_values.sort_values(ascending=False)
             for run_name, value in sorted_runs.head(5).items():
                 print(f"  🔹 {run_name}: {value:.4f}")
     
-    conn.close()
+    if owned:
+        conn.close()
+
+def flush_to_parquet(project: Optional[str] = None) -> Path:
+    """
+    将项目日志导出为按指标分区的Parquet数据集 (logs/<project>/parquet)
+    
+    SQLite 仍负责写入；导出后 plot() 和 summary() 会优先读取列式的Parquet数据，
+    之后若又有新记录写入或删除了记录，则自动回退到 SQLite，重新导出即可恢复。
+    直接修改已有记录的值不会被察觉，此时需要重新导出
+    
+    Args:
+        project: 项目名称，默认为当前运行的项目
+    
+    Returns:
+        Parquet数据集目录
+    """
+    project = project or _project_name
+    if project is None:
+        raise RuntimeError("请指定项目名称或先调用 init() 初始化实验")
+    
+    db_path = Path(f"logs/{project}/experiments.db")
+    if not db_path.exists():
+        raise FileNotFoundError(f"项目 {project} 不存在")
+    
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise ImportError("导出Parquet需要安装 pyarrow: pip install ml-plotter[fast]") from None
+    import pandas as pd
+    
+    # 当前运行尚未写入的记录先落盘
+    _flush()
+    
+    conn, owned = _project_conn(db_path)
+    # 先记下导出时日志表的状态，读取时据此判断数据集是否仍与数据库同步
+    state, last_id = _logs_state(conn)
+    df = pd.read_sql_query('''
+        SELECT id, run_name, step, metric_name, metric_value, config
+        FROM logs
+        WHERE project = ? AND id <= ?
+    ''', conn, params=[project, last_id or 0])
+    if owned:
+        conn.close()
+    
+    parquet_dir = db_path.parent / "parquet"
+    ds.write_dataset(pa.Table.from_pandas(df, preserve_index=False), parquet_dir,
+                     format='parquet', partitioning=_parquet_partitioning(),
+                     existing_data_behavior='delete_matching')
+    (parquet_dir / _PARQUET_MARKER).write_text(state)
+    
+    print(f"💾 Parquet数据已导出: {parquet_dir}")
+    return parquet_dir
+
+# 记录导出时日志表状态的文件（以下划线开头，读取数据集时会被忽略）
+_PARQUET_MARKER = "_logs_state"
+
+def _logs_state(conn: sqlite3.Connection):
+    """
+    日志表状态 "最大记录ID:记录数" 及最大记录ID
+    
+    记录ID自增且不复用，新写入的记录会改变最大ID，删除记录会改变记录数；
+    原地修改记录的值两者都不变，无法据此察觉
+    """
+    last_id, count = conn.execute('SELECT MAX(id), COUNT(*) FROM logs').fetchone()
+    return f"{last_id}:{count}", last_id
+
+def _parquet_partitioning():
+    """Parquet数据集按指标名称分区（Hive风格目录 metric_name=xxx）"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([('metric_name', pa.string())]), flavor='hive')
+
+def _synced_parquet(conn: sqlite3.Connection, db_path: Path) -> Optional[Path]:
+    """返回与数据库同步的Parquet数据集目录；未导出、导出后有记录写入或删除、缺少pyarrow时返回None"""
+    parquet_dir = db_path.parent / "parquet"
+    marker = parquet_dir / _PARQUET_MARKER
+    if not marker.exists():
+        return None
+    
+    try:
+        import pyarrow.dataset  # noqa: F401
+    except ImportError:
+        return None
+    
+    return parquet_dir if marker.read_text() == _logs_state(conn)[0] else None
+
+def _read_parquet(parquet_dir: Path, columns: List[str], metric: Optional[str] = None,
+                  runs: Optional[List[str]] = None):
+    """从Parquet数据集读取日志（按指标分区裁剪），行顺序与 SQLite 查询的 ORDER BY run_name, step 一致"""
+    import pyarrow.dataset as ds
+    
+    dataset = ds.dataset(parquet_dir, format='parquet', partitioning=_parquet_partitioning())
+    
+    condition = None
+    if metric is not None:
+        condition = ds.field('metric_name') == metric
+    if runs:
+        in_runs = ds.field('run_name').isin(runs)
+        condition = in_runs if condition is None else condition & in_runs
+    
+    columns = list(dict.fromkeys(columns + ['run_name', 'step', 'id']))
+    df = dataset.to_table(columns=columns, filter=condition).to_pandas()
+    return df.sort_values(['run_name', 'step', 'id'], kind='stable', ignore_index=True)
+
+def _config_groups(configs, group_by: str) -> Dict[str, str]:
+    """
+    解析各配置JSON（每种配置只解析一次），返回 配置文本 -> 分组标签
+    
+    旧版本写入的 NaN/Infinity 与当前写入的 null 一样解析为None，同一设置不会分成两组
+    """
+    return {
+        config: f"{group_by}={json.loads(config, parse_constant=_none_constant).get(group_by, 'unknown')}"
+        for config in configs
+    }
+
+def _none_constant(_name: str) -> None:
+    """json.loads 的 parse_constant：非有限数（NaN、Infinity、-Infinity）记为None"""
+    return None
+
+def _step_mean_std(steps: np.ndarray, values: np.ndarray):
+    """
+    按步数聚合均值和样本标准差（忽略NaN，单个数据点的标准差记为0）
+    
+    用哈希分桶 (pd.factorize) + np.bincount 分组求和，避免 pandas groupby 的索引开销
+    """
+    import numpy as np
+    import pandas as pd
+    
+    inv, uniq = pd.factorize(steps, sort=True)
+    valid = ~np.isnan(values)
+    inv, values = inv[valid], values[valid]
+    
+    counts = np.bincount(inv, minlength=len(uniq))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.bincount(inv, weights=values, minlength=len(uniq)) / counts
+        # 两遍法计算方差，避免 E[x²]-E[x]² 的数值抵消
+        dev = values - means[inv]
+        stds = np.sqrt(np.bincount(inv, weights=dev * dev, minlength=len(uniq)) / (counts - 1))
+    stds[counts <= 1] = 0
+    return uniq, means, stds
+
+def _dumps_config(config: Dict) -> str:
+    """将配置序列化为JSON文本，优先使用orjson；标准库输出与orjson保持一致"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(config, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:  # orjson不支持的类型（如超出64位的整数）交给标准库处理
+            pass
+    # 与orjson相同：紧凑分隔符、不转义非ASCII字符、NaN和无穷大写为null
+    return json.dumps(_finite_config(config), separators=(',', ':'), ensure_ascii=False)
+
+def _finite_config(value):
+    """将配置中的NaN和无穷大替换为None，非字符串键转换为orjson使用的字符串形式"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {_config_key(key): _finite_config(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite_config(item) for item in value]
+    return value
+
+def _config_key(key):
+    """非字符串键的文本形式：None和布尔值写为JSON字面量，非有限浮点数写为null"""
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, bool):
+        return json.dumps(key)
+    if isinstance(key, float) and not math.isfinite(key):
+        return 'null'
+    return key
+
+def _project_conn(db_path: Path):
+    """
+    获取读取项目数据库的连接
+    
+    读取当前运行所在的项目时直接复用已打开的连接，否则新建连接；
+    返回 (连接, 是否需要由调用方关闭)
+    """
+    if _conn is not None and db_path == _db_path:
+        return _conn, False
+    return _connect(db_path), True
+
+def _connect(db_path, **kwargs) -> sqlite3.Connection:
+    """打开数据库连接：WAL模式下读写互不阻塞，临时数据和页缓存放在内存中"""
+    conn = sqlite3.connect(db_path, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    return conn
 
 def _init_database():
     """初始化数据库"""
-    conn = sqlite3.connect(_db_path)
-    cursor = conn.cursor()
+    cursor = _conn.cursor()
     
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS logs (
@@ -324,8 +572,14 @@ def _init_database():
         ON logs(project, metric_name, run_name, step)
     ''')
     
-    conn.commit()
-    conn.close()
+    # 每个项目有独立的数据库，以project开头的按运行索引没有选择性，只会拖慢写入；
+    # 删除旧版本创建的该索引
+    cursor.execute('DROP INDEX IF EXISTS idx_project_run')
+    
+    _conn.commit()
+
+# 进程退出时写入未结束运行的剩余记录
+atexit.register(_flush)
 
 # 便捷别名
 start = init
@@ -0,0 +1,14 @@
+"""
+测试配置
+
+experiment_logger 不随本仓库发布，未安装时改用 tests/stubs 中的最小实现，
+使 ml_plotter_logger 的测试始终运行
+"""
+
+import sys
+from pathlib import Path
+
+try:
+    import experiment_logger  # noqa: F401
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent / "stubs"))
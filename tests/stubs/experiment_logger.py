@@ -0,0 +1,110 @@
+"""
+experiment_logger 的最小实现，仅供测试使用
+
+真实的 ExperimentLogger 不随本仓库发布；这里只实现 MLPlotterLogger 用到的接口，
+日志表结构与 log_batch 写入的列一致
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+
+class ExperimentLogger:
+    """基于SQLite的实验日志记录器（测试用）"""
+
+    def __init__(self, log_dir: str = "experiment_logs"):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.log_dir / "experiments.db"
+
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    experiment_id TEXT,
+                    run_id TEXT,
+                    step INTEGER,
+                    metric_name TEXT,
+                    metric_value REAL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS runs (
+                    experiment_id TEXT,
+                    run_id TEXT,
+                    params TEXT,
+                    tags TEXT
+                )
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def start_run(self, experiment_id: str, run_id: str, params: Dict,
+                  tags: Optional[List[str]] = None):
+        with self._connect() as conn:
+            conn.execute('INSERT INTO runs VALUES (?, ?, ?, ?)',
+                         (experiment_id, run_id, json.dumps(params), json.dumps(tags or [])))
+
+    def log(self, run_id: str, step: int, metrics: Dict[str, float]):
+        with self._connect() as conn:
+            experiment_id, = conn.execute(
+                'SELECT experiment_id FROM runs WHERE run_id = ? ORDER BY rowid DESC',
+                (run_id,)).fetchone()
+            conn.executemany('''
+                INSERT INTO logs (experiment_id, run_id, step, metric_name, metric_value)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(experiment_id, run_id, step, name, value) for name, value in metrics.items()])
+
+    def finish_run(self, run_id: str):
+        pass
+
+    def get_runs(self, experiment_id: str) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute('SELECT run_id, params FROM runs WHERE experiment_id = ?',
+                                (experiment_id,)).fetchall()
+        return [{'run_id': run_id, 'params': json.loads(params)} for run_id, params in rows]
+
+    def _group_key(self, run: Dict, group_by: Optional[Union[str, List[str]]]) -> str:
+        if not group_by:
+            return run['run_id']
+        keys = [group_by] if isinstance(group_by, str) else group_by
+        return ','.join(f"{key}={run['params'].get(key)}" for key in keys)
+
+    def get_metrics(self, experiment_id: str, metric_name: str,
+                    group_by: Optional[Union[str, List[str]]] = None) -> Dict[str, Dict[str, list]]:
+        """{分组: {'steps': [...], 'values': [...]}}，组内各运行依次拼接"""
+        groups = {}
+        with self._connect() as conn:
+            for run in self.get_runs(experiment_id):
+                rows = conn.execute('''
+                    SELECT step, metric_value FROM logs
+                    WHERE experiment_id = ? AND run_id = ? AND metric_name = ?
+                    ORDER BY step, id
+                ''', (experiment_id, run['run_id'], metric_name)).fetchall()
+                if not rows:
+                    continue
+                group = groups.setdefault(self._group_key(run, group_by), {'steps': [], 'values': []})
+                group['steps'].extend(step for step, _ in rows)
+                group['values'].extend(value for _, value in rows)
+        return groups
+
+    def get_summary_stats(self, experiment_id: str, metric_name: str,
+                          group_by: Optional[Union[str, List[str]]] = None) -> Dict[str, Dict]:
+        stats = {}
+        for group_key, data in self.get_metrics(experiment_id, metric_name, group_by).items():
+            values = np.asarray(data['values'], dtype=np.float64)
+            stats[group_key] = {
+                'final': values[-1], 'mean': values.mean(), 'std': values.std(),
+                'min': values.min(), 'max': values.max(), 'count': len(values),
+            }
+        return stats
+
+
+def get_logger(log_dir: str = "experiment_logs") -> ExperimentLogger:
+    return ExperimentLogger(log_dir)
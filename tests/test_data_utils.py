@@ -0,0 +1,113 @@
+"""
+data_utils 模块测试
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_plotter import data_utils
+
+
+ALPHA = 2.0 / (5 + 1)
+
+NAN_SERIES = np.array([0.0, 1.0, 2.0, np.nan, 4.0, 5.0, np.nan, np.nan, 8.0, 9.0])
+
+
+def _pandas_ema(data: np.ndarray) -> np.ndarray:
+    """参考实现：pandas ewm(adjust=False)，沿最后一维逐行计算"""
+    rows = np.asarray(data, dtype=np.float64).reshape(-1, np.shape(data)[-1])
+    return pd.DataFrame(rows.T).ewm(alpha=ALPHA, adjust=False).mean().to_numpy().T.reshape(np.shape(data))
+
+
+@pytest.fixture
+def lfilter_path(monkeypatch):
+    """禁用Numba内核，走 SciPy lfilter 实现"""
+    monkeypatch.setattr(data_utils, '_ema_kernel', None)
+
+
+def test_ema_lfilter_skips_nan(lfilter_path):
+    """lfilter实现遇到NaN后继续递推，与 pandas ewm(adjust=False) 一致"""
+    result = data_utils._ema(NAN_SERIES, ALPHA)
+
+    np.testing.assert_allclose(result, _pandas_ema(NAN_SERIES), rtol=1e-12)
+    assert np.isfinite(result).all()
+
+
+def test_ema_lfilter_mixed_rows(lfilter_path):
+    """二维输入中含NaN和不含NaN的行分别与 pandas 结果一致"""
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(3, 50))
+    data[1, [0, 7, 8, 30]] = np.nan
+
+    np.testing.assert_allclose(data_utils._ema(data, ALPHA), _pandas_ema(data),
+                               rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.skipif(data_utils._ema_kernel is None, reason="需要Numba")
+@pytest.mark.parametrize('data', [
+    NAN_SERIES,
+    np.array([np.nan, np.nan, 1.0, 2.0, np.nan, 3.0]),
+    np.array([np.nan, np.nan, np.nan]),
+    np.random.default_rng(1).normal(size=(4, 200)),
+])
+def test_ema_kernel_matches_lfilter_and_pandas(data, monkeypatch):
+    """Numba内核与lfilter实现都与 pandas ewm(adjust=False) 一致"""
+    expected = _pandas_ema(data)
+    njit_result = data_utils._ema(data, ALPHA)
+    monkeypatch.setattr(data_utils, '_ema_kernel', None)
+    lfilter_result = data_utils._ema(data, ALPHA)
+
+    np.testing.assert_allclose(njit_result, expected, rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(lfilter_result, expected, rtol=1e-12, equal_nan=True)
+
+
+def test_csv_cache_is_module_level(tmp_path):
+    """CSV解析缓存不持有 DataProcessor 实例，文件变化后重新解析"""
+    csv_path = tmp_path / "run.csv"
+    csv_path.write_text("Step,Value\n0,1.0\n1,2.0\n")
+
+    processor = data_utils.DataProcessor()
+    steps, values = processor.load_csv_data(str(csv_path))
+    assert data_utils.DataProcessor().load_csv_data(str(csv_path))[1] is values
+    np.testing.assert_array_equal(values, [1.0, 2.0])
+
+    csv_path.write_text("Step,Value\n0,1.0\n1,2.0\n2,3.0\n")
+    _, values = processor.load_csv_data(str(csv_path))
+    np.testing.assert_array_equal(values, [1.0, 2.0, 3.0])
+
+
+def test_max_score_uses_cleaned_rows(tmp_path):
+    """最大分数与曲线使用相同的行：跳过缺失步数，重复步数取第一次记录"""
+    folder = tmp_path / "cond"
+    folder.mkdir()
+    (folder / "seed0.csv").write_text("Step,Value\n0,1.0\n1,2.0\n1,9.0\n,7.0\n2,3.0\n")
+    (folder / "seed1.csv").write_text("Step,Value\n0,\n")
+
+    processor = data_utils.DataProcessor()
+    _, values = processor.load_csv_data(str(folder / "seed0.csv"))
+
+    assert processor.extract_max_scores(str(folder)) == [values.max()] == [3.0]
+
+
+def test_box_stats_matches_matplotlib():
+    """箱线图统计量与 matplotlib.cbook.boxplot_stats 一致，忽略非有限值"""
+    from matplotlib import cbook
+
+    values = np.append(np.random.default_rng(2).normal(size=40), [8.0, -9.0, np.nan, np.inf])
+    stats = data_utils.DataProcessor().box_stats(values, label="PPO")
+    expected, = cbook.boxplot_stats(values[np.isfinite(values)])
+
+    assert stats["label"] == "PPO"
+    for key in ("mean", "med", "q1", "q3", "whislo", "whishi"):
+        assert stats[key] == pytest.approx(expected[key])
+    np.testing.assert_array_equal(np.sort(stats["fliers"]), np.sort(expected["fliers"]))
+
+
+def test_group_mean_std_unequal_groups():
+    """不等长的组分别计算均值和总体标准差"""
+    groups = [[1.0, 2.0, 3.0], [4.0], np.array([5.0, 7.0])]
+    means, stds = data_utils.DataProcessor().group_mean_std(groups)
+
+    np.testing.assert_allclose(means, [2.0, 4.0, 6.0])
+    np.testing.assert_allclose(stds, [np.std([1.0, 2.0, 3.0]), 0.0, 1.0])
@@ -0,0 +1,117 @@
+"""
+ml_plotter 模块测试
+"""
+
+import matplotlib
+import numpy as np
+
+from ml_plotter import ml_plotter
+
+matplotlib.use("Agg")
+
+
+def _write_run(folder, values):
+    folder.mkdir(parents=True, exist_ok=True)
+    lines = ["Step,Value"] + [f"{i},{v}" for i, v in enumerate(values)]
+    (folder / "seed0.csv").write_text("\n".join(lines) + "\n")
+
+
+def test_folder_cache_is_bounded(tmp_path, monkeypatch):
+    """文件夹数据缓存超出容量时淘汰最久未使用的条目"""
+    monkeypatch.setattr(ml_plotter, '_CACHE_MAXSIZE', 2)
+    monkeypatch.setattr(ml_plotter, '_FOLDER_CACHE', ml_plotter.OrderedDict())
+
+    folders = [tmp_path / f"cond{i}" for i in range(3)]
+    for folder in folders:
+        _write_run(folder, [1.0, 2.0, 3.0])
+
+    ml_plotter._cached_folder_load('load_folder_data', str(folders[0]))
+    ml_plotter._cached_folder_load('load_folder_data', str(folders[1]))
+    ml_plotter._cached_folder_load('load_folder_data', str(folders[0]))
+    ml_plotter._cached_folder_load('load_folder_data', str(folders[2]))
+
+    assert list(ml_plotter._FOLDER_CACHE) == [
+        ('load_folder_data', str(folders[0])),
+        ('load_folder_data', str(folders[2])),
+    ]
+
+
+def test_smooth_cache_is_bounded(tmp_path, monkeypatch):
+    """平滑结果缓存同样受容量限制"""
+    monkeypatch.setattr(ml_plotter, '_CACHE_MAXSIZE', 2)
+    monkeypatch.setattr(ml_plotter, '_SMOOTH_CACHE', ml_plotter.OrderedDict())
+
+    folders = [tmp_path / f"cond{i}" for i in range(3)]
+    for folder in folders:
+        _write_run(folder, np.arange(10.0))
+        data = ml_plotter.data_processor.load_folder_data(str(folder))
+        ml_plotter._cached_smoothed(str(folder), data)
+
+    assert [key[0] for key in ml_plotter._SMOOTH_CACHE] == [str(folders[1]), str(folders[2])]
+
+
+def test_unsmoothed_curves_are_not_downsampled(tmp_path):
+    """关闭平滑时绘制全部原始数据点，不抽稀"""
+    values = np.random.default_rng(0).normal(size=20000)
+    _write_run(tmp_path / "cond", values)
+
+    fig = ml_plotter.MLPlotter().plot_training_curves({'cond': str(tmp_path / "cond")},
+                                                      smooth=False, show_std=False)
+    line, = fig.axes[0].get_lines()
+
+    np.testing.assert_allclose(line.get_ydata(), values.astype(np.float32))
+
+
+def _axes_state(ax):
+    """脊线与刻度状态，用于比较两张图的坐标轴设置"""
+    return (
+        {name: (spine.get_visible(), spine.get_linewidth()) for name, spine in ax.spines.items()},
+        ax.xaxis.get_tick_params(), ax.yaxis.get_tick_params(),
+        [label.get_rotation() for label in ax.get_xticklabels()],
+    )
+
+
+def test_reused_figure_matches_fresh_figure(tmp_path):
+    """复用Figure时，柱状图之后绘制的曲线图与新建Figure的结果一致"""
+    for name in ("a", "b"):
+        _write_run(tmp_path / name, np.linspace(0.0, 1.0, 50))
+    conditions = {name: str(tmp_path / name) for name in ("a", "b")}
+
+    reusing = ml_plotter.MLPlotter(reuse_figure=True)
+    reusing.plot_performance_bars(conditions)
+    reused = reusing.plot_training_curves(conditions)
+    fresh = ml_plotter.MLPlotter().plot_training_curves(conditions)
+
+    assert _axes_state(reused.axes[0]) == _axes_state(fresh.axes[0])
+    reused.canvas.draw()
+    fresh.canvas.draw()
+    np.testing.assert_array_equal(np.asarray(reused.canvas.buffer_rgba()),
+                                  np.asarray(fresh.canvas.buffer_rgba()))
+
+
+def test_bars_with_duplicate_labels_get_separate_positions(tmp_path):
+    """重复的标签各自绘制一根柱子，不合并到同一个分类位置"""
+    paths = []
+    for name in ("a", "b"):
+        _write_run(tmp_path / name, [1.0, 2.0])
+        paths.append(str(tmp_path / name))
+
+    fig = ml_plotter.MLPlotter().plot_performance_bars(paths, labels=["PPO", "PPO"])
+    ax = fig.axes[0]
+
+    assert [patch.get_x() + patch.get_width() / 2 for patch in ax.patches] == [0.0, 1.0]
+    assert [label.get_text() for label in ax.get_xticklabels()] == ["PPO", "PPO"]
+
+
+def test_training_curves_are_labeled_lines(tmp_path):
+    """每个条件的曲线是带标签的Line2D，调用方可以重建图例或处理曲线"""
+    for name in ("a", "b"):
+        _write_run(tmp_path / name, np.linspace(0.0, 1.0, 50))
+
+    fig = ml_plotter.MLPlotter().plot_training_curves(
+        {name: str(tmp_path / name) for name in ("a", "b")}, smooth=False)
+    ax = fig.axes[0]
+
+    assert [line.get_label() for line in ax.get_lines()] == ["a", "b"]
+    legend = ax.legend(loc="upper left")
+    assert [text.get_text() for text in legend.get_texts()] == ["a", "b"]
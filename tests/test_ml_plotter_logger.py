@@ -0,0 +1,114 @@
+"""
+ml_plotter_logger 模块测试
+"""
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from ml_plotter_logger import MLPlotterLogger
+
+
+def test_export_to_csv_keeps_columns_and_null_rows(tmp_path):
+    """导出的列按指标首次出现的顺序排列，只有空值的步和指标也保留（与逐运行组装字典的旧实现输出一致）"""
+    nan = np.nan
+    with MLPlotterLogger(str(tmp_path / "logs")) as logger:
+        logger.start_run("exp", "run0", {"lr": 0.1})
+        logger.log_batch("run0", [0, 1, 2], {"zeta": [1.0, nan, 3.0], "alpha": [nan, nan, 0.5]})
+        logger.log_batch("run0", [3], {"zeta": [nan], "alpha": [nan]})
+        logger.log_batch("run0", [2, 4], {"beta": [7.0, 8.0], "zeta": [nan, 9.0]})
+        logger.log_batch("run0", [5], {"gamma": [nan]})
+        logger.start_run("exp", "run1", {"lr": 0.2})
+        logger.log_batch("run1", [0, 1], {"loss": [nan, nan]})
+
+        output_dir = tmp_path / "csv"
+        logger.export_to_csv("exp", str(output_dir))
+
+    assert (output_dir / "run0.csv").read_text() == (
+        "Step,exp - alpha,exp - zeta,exp - beta,exp - gamma\n"
+        "0,,1.0,,\n"
+        "1,,,,\n"
+        "2,0.5,,7.0,\n"
+        "3,,,,\n"
+        "4,,9.0,8.0,\n"
+        "5,,,,\n"
+    )
+    assert (output_dir / "run1.csv").read_text() == "Step,exp - loss\n0,\n1,\n"
+
+
+def test_auto_plot_reuse_figure_returns_saved_paths(tmp_path, capsys):
+    """复用Figure时按图表名称返回保存路径，完成提示统计保存的图表数"""
+    with MLPlotterLogger(str(tmp_path / "logs")) as logger:
+        for lr in (0.1, 0.01):
+            run_id = f"lr{lr}"
+            logger.start_run("exp", run_id, {"lr": lr})
+            logger.log_batch(run_id, np.arange(0, 30, 3), {"loss": np.linspace(1.0, 0.0, 10)})
+
+        figures = logger.auto_plot_experiment("exp", group_by="lr", reuse_figure=True)
+
+    assert sorted(figures) == ["loss_bars", "loss_curves"]
+    assert all(path.is_file() for path in figures.values())
+    assert "生成了 2 个图表" in capsys.readouterr().out
+
+
+def test_auto_plot_in_processes_saves_same_plots(tmp_path):
+    """多进程绘制保存的图表与在当前进程中绘制的一致"""
+    with MLPlotterLogger(str(tmp_path / "logs")) as logger:
+        for lr in (0.1, 0.01):
+            run_id = f"lr{lr}"
+            logger.start_run("exp", run_id, {"lr": lr})
+            logger.log_batch(run_id, np.arange(0, 30, 3), {"loss": np.linspace(1.0, 0.0, 10),
+                                                           "acc": np.linspace(0.0, lr, 10)})
+
+        serial = {name: path.read_bytes() for name, path in
+                  logger.auto_plot_experiment("exp", group_by="lr", reuse_figure=True, save_dpi=50).items()}
+        parallel = logger.auto_plot_experiment("exp", group_by="lr", processes=2, save_dpi=50)
+
+    assert list(parallel) == list(serial)
+    assert {name: path.read_bytes() for name, path in parallel.items()} == serial
+
+
+def test_log_batch_writes_all_metrics(tmp_path):
+    """log_batch 一次写入所有指标，与逐步调用 log() 的结果一致"""
+    with MLPlotterLogger(str(tmp_path / "logs")) as logger:
+        logger.start_run("exp", "batch", {})
+        logger.log_batch("batch", np.array([0, 5, 10]), {"loss": [1.0, 0.5, 0.25], "acc": np.array([0.1, 0.2, 0.3])})
+        logger.start_run("exp", "single", {})
+        for step, loss, acc in zip([0, 5, 10], [1.0, 0.5, 0.25], [0.1, 0.2, 0.3]):
+            logger.log("single", step, {"loss": loss, "acc": acc})
+
+        batch = logger.logger.get_metrics("exp", "loss")["batch"]
+        assert batch == logger.logger.get_metrics("exp", "loss")["single"]
+        assert batch == {"steps": [0, 5, 10], "values": [1.0, 0.5, 0.25]}
+
+
+def test_log_batch_rejects_mismatched_lengths(tmp_path):
+    """指标长度与步数不一致时报错，不写入任何记录"""
+    with MLPlotterLogger(str(tmp_path / "logs")) as logger:
+        logger.start_run("exp", "run0", {})
+        with pytest.raises(ValueError):
+            logger.log_batch("run0", [0, 1], {"loss": [1.0]})
+        assert logger.logger.get_metrics("exp", "loss") == {}
+
+
+def test_log_batch_checks_table_schema(tmp_path):
+    """日志表有批量写入无法填充的必填列时报错"""
+    with MLPlotterLogger(str(tmp_path / "logs")) as logger:
+        logger.start_run("exp", "run0", {})
+        conn = sqlite3.connect(logger.logger.db_path)
+        conn.execute("ALTER TABLE logs ADD COLUMN host TEXT NOT NULL DEFAULT 'local'")
+        conn.commit()
+        logger.log_batch("run0", [0], {"loss": [1.0]})
+
+        conn.execute("DROP TABLE logs")
+        conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, experiment_id TEXT, run_id TEXT, "
+                     "step INTEGER, metric_name TEXT, metric_value REAL, host TEXT NOT NULL)")
+        conn.commit()
+        conn.close()
+        with pytest.raises(RuntimeError, match="host"):
+            logger.log_batch("run0", [1], {"loss": [0.5]})
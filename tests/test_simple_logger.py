@@ -0,0 +1,167 @@
+"""
+simple_logger 模块测试
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+import simple_logger
+
+
+CONFIG = {"lr": 0.1, "name": "基线", "clip": float("nan"), "sizes": [64, float("inf")], 3: None, "use_bn": True}
+
+EXPECTED = '{"lr":0.1,"name":"基线","clip":null,"sizes":[64,null],"3":null,"use_bn":true}'
+
+
+@pytest.fixture(params=["orjson", "json"])
+def serializer(request, monkeypatch):
+    """分别使用orjson和标准库json序列化配置"""
+    if request.param == "orjson":
+        if simple_logger.orjson is None:
+            pytest.skip("需要orjson")
+    else:
+        monkeypatch.setattr(simple_logger, "orjson", None)
+    return request.param
+
+
+def test_dumps_config_same_text_without_orjson(serializer):
+    """是否安装orjson，配置序列化得到的文本都相同"""
+    assert simple_logger._dumps_config(CONFIG) == EXPECTED
+
+
+def test_run_groups_same_without_orjson(serializer):
+    """分组标签只取决于配置内容，与序列化方式无关"""
+    config_json = simple_logger._dumps_config({"lr": 1e-5, "clip": float("nan")})
+
+    assert simple_logger._config_groups([config_json], "lr") == {config_json: "lr=1e-05"}
+    assert simple_logger._config_groups([config_json], "clip") == {config_json: "clip=None"}
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    """在临时目录中记录实验，结束时关闭运行"""
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    simple_logger.finish()
+
+
+def _logged_rows(project):
+    conn = sqlite3.connect(f"logs/{project}/experiments.db")
+    try:
+        return conn.execute("SELECT step, timestamp FROM logs ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_log_records_time_of_logging(project_dir, monkeypatch):
+    """缓冲写入时每条记录保留调用 log() 时的时间，而不是写入数据库的时间"""
+    simple_logger.init("proj", name="run0")
+    for step, second in enumerate((0, 1)):
+        monkeypatch.setattr(simple_logger.time, "gmtime",
+                            lambda secs=None, second=second: time.struct_time((2024, 1, 2, 3, 4, second, 1, 2, 0)))
+        simple_logger.log({"loss": 1.0}, step=step)
+    simple_logger.finish()
+
+    assert _logged_rows("proj") == [(0, "2024-01-02 03:04:00"), (1, "2024-01-02 03:04:01")]
+
+
+def test_log_flushes_after_interval(project_dir, monkeypatch):
+    """距上次写入超过间隔后 log() 即写入数据库，其他连接无需等运行结束就能读到"""
+    simple_logger.init("proj", name="run0")
+    simple_logger.log({"loss": 1.0})
+    assert _logged_rows("proj") == []
+
+    monkeypatch.setattr(simple_logger, "_FLUSH_INTERVAL", 0.0)
+    simple_logger.log({"loss": 0.5})
+    assert [step for step, _ in _logged_rows("proj")] == [0, 1]
+
+
+def test_init_drops_per_run_index(project_dir):
+    """日志表只保留按指标查询使用的索引"""
+    simple_logger.init("proj", name="run0")
+    simple_logger._conn.execute("CREATE INDEX idx_project_run ON logs(project, run_name, step)")
+    simple_logger.init("proj", name="run1")
+
+    indexes = [name for name, in simple_logger._conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'logs'")]
+    assert indexes == ["idx_project_metric"]
+
+
+@pytest.mark.parametrize("parquet", [False, True])
+def test_same_named_runs_keep_their_groups(project_dir, capsys, parquet):
+    """同名运行（如同一秒内启动的默认名称）配置不同时，plot() 和 summary() 仍按配置分组"""
+    if parquet:
+        pytest.importorskip("pyarrow")
+    for lr in (0.1, 0.01, 0.001):
+        simple_logger.init("proj", name="run_0", config={"lr": lr})
+        for step in range(3):
+            simple_logger.log({"loss": lr * step}, step=step)
+        simple_logger.finish()
+    if parquet:
+        simple_logger.flush_to_parquet("proj")
+
+    fig = simple_logger.plot("proj", "loss", group_by="lr", save=False)
+    lines = {line.get_label(): line.get_ydata().tolist() for line in fig.axes[0].get_lines()}
+    assert lines == {"lr=0.1": [0.0, 0.1, 0.2], "lr=0.01": [0.0, 0.01, 0.02], "lr=0.001": [0.0, 0.001, 0.002]}
+
+    capsys.readouterr()
+    simple_logger.summary("proj", group_by="lr")
+    out = capsys.readouterr().out
+    assert [line.strip() for line in out.splitlines() if line.strip().startswith("🔹")] == [
+        "🔹 lr=0.1", "🔹 lr=0.01", "🔹 lr=0.001"]
+
+
+def test_config_groups_merge_old_nan_rows():
+    """旧版本写入的 NaN 与当前写入的 null 得到相同的分组标签"""
+    old, new = '{"clip": NaN, "lr": Infinity}', '{"clip":null,"lr":null}'
+
+    groups = simple_logger._config_groups([old, new], "clip")
+    assert groups[old] == groups[new] == "clip=None"
+    assert simple_logger._config_groups([old], "lr")[old] == "lr=None"
+
+
+def test_step_mean_std_matches_groupby():
+    """按步数聚合的均值和样本标准差与 pandas groupby 一致，单个数据点的标准差为0"""
+    import numpy as np
+    import pandas as pd
+
+    steps = np.array([2, 0, 1, 0, 2, 1, 3, 2])
+    values = np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, 9.0])
+    uniq, means, stds = simple_logger._step_mean_std(steps, values)
+
+    expected = pd.Series(values).groupby(steps).agg(["mean", "std"]).fillna(0)
+    np.testing.assert_array_equal(uniq, expected.index)
+    np.testing.assert_allclose(means, expected["mean"])
+    np.testing.assert_allclose(stds, expected["std"])
+
+
+def test_parquet_marker_tracks_writes_and_deletes(project_dir):
+    """Parquet数据集在写入或删除记录后不再视为同步，重新导出后恢复"""
+    pytest.importorskip("pyarrow")
+    simple_logger.init("proj", name="run0")
+    for step in range(3):
+        simple_logger.log({"loss": float(step)}, step=step)
+    parquet_dir = simple_logger.flush_to_parquet("proj")
+    db_path = parquet_dir.parent / "experiments.db"
+
+    def synced():
+        conn = sqlite3.connect(db_path)
+        try:
+            return simple_logger._synced_parquet(conn, db_path)
+        finally:
+            conn.close()
+
+    assert synced() == parquet_dir
+
+    simple_logger.log({"loss": 3.0}, step=3)
+    simple_logger._flush()
+    assert synced() is None
+
+    simple_logger.flush_to_parquet("proj")
+    assert synced() == parquet_dir
+
+    simple_logger._conn.execute("DELETE FROM logs WHERE step = 0")
+    simple_logger._conn.commit()
+    assert synced() is None